@@ -2,13 +2,9 @@ from typing import Annotated
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthenticatedUser
 from app.api.dependencies import AuthServiceDep
-from app.core.database import get_db
-from app.models.user import User
 
 # Security scheme para documentação automática do Swagger
 security = HTTPBearer(
@@ -17,15 +13,14 @@ security = HTTPBearer(
 )
 
 
-async def get_current_user_id(
+async def get_current_principal(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     auth_service: AuthServiceDep
-) -> UUID:
+) -> AuthenticatedUser:
     token = credentials.credentials
     
     try:
-        user_id = await auth_service.verify_access_token(token)
-        return user_id
+        return await auth_service.authenticate_access_token(token)
     
     except ValueError as e:
         raise HTTPException(
@@ -41,30 +36,27 @@ async def get_current_user_id(
         )
 
 
+# FastAPI resolve o principal uma única vez por request
+CurrentPrincipalDep = Annotated[AuthenticatedUser, Depends(get_current_principal)]
+
+
+async def get_current_user_id(principal: CurrentPrincipalDep) -> UUID:
+    return principal.user_id
+
+
 # Type alias para facilitar uso nos endpoints
 CurrentUserDep = Annotated[UUID, Depends(get_current_user_id)]
 
 
-async def get_current_admin_id(
-    user_id: CurrentUserDep,
-    db: Annotated[AsyncSession, Depends(get_db)]
-) -> UUID:
-    result = await db.execute(
-        select(User).where(
-            User.id == user_id,
-            User.is_active.is_(True),
-            User.deleted_at.is_(None)
-        )
-    )
-    user = result.scalar_one_or_none()
-
-    if not user or not user.is_admin:
+async def get_current_admin_id(principal: CurrentPrincipalDep) -> UUID:
+    # Claim `adm` + papel no status em cache, sem consulta extra ao banco
+    if not principal.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso restrito a administradores"
         )
 
-    return user_id
+    return principal.user_id
 
 
 CurrentAdminDep = Annotated[UUID, Depends(get_current_admin_id)]
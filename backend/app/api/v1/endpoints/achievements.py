@@ -1,59 +1,105 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Request, Response, status, Query
+from pydantic import TypeAdapter
 from uuid import UUID
 
 from app.schemas.achievement import (
     AchievementResponse,
+    AchievementCatalogItem,
     UserAchievementsResponse,
     AchievementDetail,
     AchievementCreate,
     AchievementUpdate,
+    AchievementBackfillStatus,
     CheckAchievementsResponse
 )
 from app.schemas.common import MessageResponse
 from app.models.achievement import AchievementCategory, AchievementRarity
 from app.api.dependencies import AchievementServiceDep
 from app.api.auth import CurrentUserDep, CurrentAdminDep
+from app.services.achievement_backfill import (
+    get_backfill_status,
+    schedule_achievement_backfill
+)
+from app.core.http_cache import make_etag, public_json_response
+from app.core.config import settings
 
 router = APIRouter(prefix="/achievements", tags=["Achievements"])
 
+_catalog_adapter = TypeAdapter(list[AchievementCatalogItem])
+_achievements_adapter = TypeAdapter(list[AchievementResponse])
+_not_modified = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "Conteúdo não modificado (ETag)"}
+}
+
 
 # public routes (sem autenticação)
 @router.get(
     "",
-    response_model=list[AchievementResponse],
-    summary="Listar todas as conquistas"
+    response_model=list[AchievementCatalogItem],
+    summary="Listar todas as conquistas",
+    responses=_not_modified
 )
 async def list_all_achievements(
+    request: Request,
     achievement_service: AchievementServiceDep,
     include_hidden: bool = Query(False, description="Incluir conquistas ocultas")
 ):
-    return await achievement_service.list_all_achievements(
-        include_hidden=include_hidden
+    """
+    Lista o catálogo com a raridade real de cada conquista
+    (`holders_percentage`: % de usuários ativos que a desbloquearam).
+    """
+    version = await achievement_service.get_catalog_version(include_rarity=True)
+    return await public_json_response(
+        request,
+        make_etag("achievements", str(include_hidden), version),
+        settings.http_cache_catalog_max_age,
+        _catalog_adapter,
+        lambda: achievement_service.list_all_achievements(
+            include_hidden=include_hidden
+        )
     )
 
 
 @router.get(
     "/category/{category}",
     response_model=list[AchievementResponse],
-    summary="Listar conquistas por categoria"
+    summary="Listar conquistas por categoria",
+    responses=_not_modified
 )
 async def list_by_category(
+    request: Request,
     category: AchievementCategory,
     achievement_service: AchievementServiceDep
 ):
-    return await achievement_service.list_by_category(category)
+    version = await achievement_service.get_catalog_version()
+    return await public_json_response(
+        request,
+        make_etag("achievements:category", category.value, version),
+        settings.http_cache_catalog_max_age,
+        _achievements_adapter,
+        lambda: achievement_service.list_by_category(category)
+    )
 
 
 @router.get(
     "/rarity/{rarity}",
     response_model=list[AchievementResponse],
-    summary="Listar conquistas por raridade"
+    summary="Listar conquistas por raridade",
+    responses=_not_modified
 )
 async def list_by_rarity(
+    request: Request,
     rarity: AchievementRarity,
     achievement_service: AchievementServiceDep
 ):
-    return await achievement_service.list_by_rarity(rarity)
+    version = await achievement_service.get_catalog_version()
+    return await public_json_response(
+        request,
+        make_etag("achievements:rarity", rarity.value, version),
+        settings.http_cache_catalog_max_age,
+        _achievements_adapter,
+        lambda: achievement_service.list_by_rarity(rarity)
+    )
 
 
 @router.get(
@@ -72,18 +118,34 @@ async def get_achievement_stats(
 @router.get(
     "/me",
     response_model=UserAchievementsResponse,
-    summary="Minhas conquistas"
+    summary="Minhas conquistas",
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Conteúdo não modificado (ETag)"}
+    }
 )
 async def get_my_achievements(
+    request: Request,
+    response: Response,
     user_id: CurrentUserDep,
     achievement_service: AchievementServiceDep,
     use_cache: bool = Query(True, description="Usar cache")
 ):
-    return await achievement_service.get_user_achievements(
+    achievements, etag = await achievement_service.get_user_achievements_with_etag(
         user_id,
-        use_cache=use_cache
+        use_cache=use_cache,
+        if_none_match=request.headers.get("if-none-match")
     )
 
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if achievements is None:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=headers
+        )
+
+    response.headers.update(headers)
+    return achievements
+
 
 @router.get(
     "/me/{achievement_id}",
@@ -224,3 +286,90 @@ async def deactivate_achievement(
     return MessageResponse(
         message="Conquista desativada com sucesso"
     )
+
+
+@router.delete(
+    "/admin/{achievement_id}/users/{target_user_id}",
+    response_model=MessageResponse,
+    summary="[ADMIN] Revogar conquista de um usuário",
+    responses={
+        status.HTTP_403_FORBIDDEN: {"description": "Acesso restrito a administradores"}
+    }
+)
+async def revoke_user_achievement(
+    achievement_id: UUID,
+    target_user_id: UUID,
+    user_id: CurrentAdminDep,
+    achievement_service: AchievementServiceDep
+):
+    """
+    **[ADMIN ONLY]** Remove uma conquista desbloqueada de um usuário.
+
+    **Requer autenticação.**
+    """
+    revoked = await achievement_service.revoke_achievement(
+        target_user_id,
+        achievement_id
+    )
+
+    if not revoked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não possui esta conquista"
+        )
+
+    return MessageResponse(
+        message="Conquista revogada com sucesso"
+    )
+
+
+@router.get(
+    "/admin/{achievement_id}/backfill",
+    response_model=AchievementBackfillStatus,
+    summary="[ADMIN] Progresso do backfill de uma conquista",
+    responses={
+        status.HTTP_403_FORBIDDEN: {"description": "Acesso restrito a administradores"}
+    }
+)
+async def get_achievement_backfill_status(
+    achievement_id: UUID,
+    user_id: CurrentAdminDep
+):
+    """
+    **[ADMIN ONLY]** Retorna o progresso do último backfill da conquista.
+
+    O backfill roda automaticamente ao criar, reativar ou reduzir o
+    `criteria_value` de uma conquista.
+    """
+    progress = await get_backfill_status(achievement_id)
+
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum backfill registrado para esta conquista"
+        )
+
+    return progress
+
+
+@router.post(
+    "/admin/{achievement_id}/backfill",
+    response_model=MessageResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="[ADMIN] Reprocessar backfill de uma conquista",
+    responses={
+        status.HTTP_403_FORBIDDEN: {"description": "Acesso restrito a administradores"}
+    }
+)
+async def run_achievement_backfill(
+    achievement_id: UUID,
+    user_id: CurrentAdminDep
+):
+    """
+    **[ADMIN ONLY]** Agenda a avaliação da conquista para todos os usuários.
+    """
+    schedule_achievement_backfill(achievement_id)
+
+    return MessageResponse(
+        message="Backfill agendado"
+    )
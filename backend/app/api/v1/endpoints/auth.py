@@ -11,10 +11,12 @@ from app.schemas.auth import (
 from app.schemas.user import UserLoginResponse
 from app.schemas.common import MessageResponse
 from app.api.dependencies import AuthServiceDep
-from app.api.auth import CurrentUserDep
+from app.api.auth import CurrentUserDep, CurrentPrincipalDep
 from app.core.audit import log_security_event
 from app.core.logging import mask_sensitive
 from app.core.metrics import security_metrics
+from app.core.security import PasswordHashingUnavailable
+from app.core.login_throttle import LoginLockedOut, login_throttle
 from app.core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -22,6 +24,8 @@ GENERIC_REGISTER_ERROR_MESSAGE = (
     "Não foi possível concluir o cadastro com os dados informados"
 )
 GENERIC_LOGIN_ERROR_MESSAGE = "Email ou senha inválidos"
+AUTH_BUSY_MESSAGE = "Serviço temporariamente sobrecarregado, tente novamente"
+LOGIN_LOCKED_MESSAGE = "Muitas tentativas de login, tente novamente mais tarde"
 REFRESH_COOKIE_NAME = "refresh_token"
 AUTH_MODE_HEADER = "x-auth-mode"
 COOKIE_AUTH_MODE = "cookie"
@@ -31,6 +35,20 @@ def _raise_generic_auth_error(status_code: int, detail: str) -> None:
     raise HTTPException(status_code=status_code, detail=detail)
 
 
+def _raise_auth_busy(request: Request, flow: str) -> None:
+    security_metrics.increment_auth(flow, "shed")
+    log_security_event(
+        event=f"auth_{flow}_shed",
+        request=request,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=AUTH_BUSY_MESSAGE,
+        headers={"Retry-After": str(settings.password_hash_retry_after_seconds)}
+    )
+
+
 def _is_cookie_auth_request(request: Request) -> bool:
     return request.headers.get(AUTH_MODE_HEADER, "").lower() == COOKIE_AUTH_MODE
 
@@ -67,7 +85,10 @@ def _clear_refresh_cookie(response: Response) -> None:
     "/register",
     response_model=AuthSuccessResponse,
     status_code=status.HTTP_201_CREATED,
-    summary="Registrar novo usuário"
+    summary="Registrar novo usuário",
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Pool de hashing saturado"}
+    }
 )
 async def register(
     user_data: UserRegister,
@@ -102,6 +123,9 @@ async def register(
             "tokens": _token_response_for_client(tokens, cookie_auth=cookie_auth)
         }
     
+    except PasswordHashingUnavailable:
+        _raise_auth_busy(request, "register")
+
     except ValueError as e:
         log_security_event(
             event="auth_register_failed",
@@ -121,7 +145,11 @@ async def register(
 @router.post(
     "/login",
     response_model=AuthSuccessResponse,
-    summary="Fazer login"
+    summary="Fazer login",
+    responses={
+        status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Login bloqueado temporariamente"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Pool de hashing saturado"}
+    }
 )
 async def login(
     login_data: UserLogin,
@@ -129,8 +157,31 @@ async def login(
     response: Response,
     auth_service: AuthServiceDep
 ):
+    client_ip = request.client.host if request.client else None
+
+    # Bloqueio é verificado antes de qualquer trabalho de bcrypt
+    try:
+        await login_throttle.check(login_data.email, client_ip)
+    except LoginLockedOut as e:
+        security_metrics.increment_auth("login", "locked")
+        log_security_event(
+            event="auth_login_locked",
+            request=request,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            extra={
+                "email": mask_sensitive(login_data.email),
+                "retry_after_seconds": e.retry_after_seconds
+            }
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=LOGIN_LOCKED_MESSAGE,
+            headers={"Retry-After": str(e.retry_after_seconds)}
+        )
+
     try:
         user, tokens = await auth_service.login_user(login_data)
+        await login_throttle.register_success(login_data.email)
 
         cookie_auth = settings.auth_dual_mode_enabled and _is_cookie_auth_request(
             request
@@ -157,7 +208,11 @@ async def login(
             "tokens": _token_response_for_client(tokens, cookie_auth=cookie_auth)
         }
     
+    except PasswordHashingUnavailable:
+        _raise_auth_busy(request, "login")
+
     except ValueError as e:
+        await login_throttle.register_failure(login_data.email, client_ip)
         security_metrics.increment_auth("login", "failed")
         log_security_event(
             event="auth_login_failed",
@@ -181,6 +236,7 @@ async def login(
 )
 async def refresh_token(
     request: Request,
+    response: Response,
     auth_service: AuthServiceDep,
     token_data: TokenRefresh | None = None
 ):
@@ -204,9 +260,18 @@ async def refresh_token(
         if not refresh_token_value:
             raise ValueError("Refresh token ausente")
 
-        new_access_token = await auth_service.refresh_access_token(
+        new_access_token, new_refresh_token = await auth_service.refresh_access_token(
             refresh_token_value
         )
+
+        # Rotação: o refresh anterior deixa de valer
+        body_refresh_token = None
+        if new_refresh_token:
+            if settings.auth_dual_mode_enabled:
+                _set_refresh_cookie(response, new_refresh_token)
+            if auth_mode != "cookie":
+                body_refresh_token = new_refresh_token
+
         security_metrics.increment_auth("refresh", "success")
         log_security_event(
             event="auth_refresh_success",
@@ -217,6 +282,7 @@ async def refresh_token(
         
         return AccessTokenResponse(
             access_token=new_access_token,
+            refresh_token=body_refresh_token,
             token_type="bearer",
             expires_in=settings.access_token_expire_minutes * 60
         )
@@ -237,15 +303,16 @@ async def refresh_token(
 @router.post(
     "/logout",
     response_model=MessageResponse,
-    summary="Fazer logout"
+    summary="Fazer logout (device atual)"
 )
 async def logout(
     request: Request,
     response: Response,
-    user_id: CurrentUserDep,
+    principal: CurrentPrincipalDep,
     auth_service: AuthServiceDep
 ):
-    await auth_service.logout_user(user_id)
+    user_id = principal.user_id
+    await auth_service.logout_user(principal)
     cookie_auth = settings.auth_dual_mode_enabled and _is_cookie_auth_request(
         request
     )
@@ -264,6 +331,32 @@ async def logout(
     )
 
 
+@router.post(
+    "/logout-all",
+    response_model=MessageResponse,
+    summary="Encerrar sessões em todos os devices"
+)
+async def logout_all(
+    request: Request,
+    response: Response,
+    user_id: CurrentUserDep,
+    auth_service: AuthServiceDep
+):
+    await auth_service.logout_all_devices(user_id)
+    if settings.auth_dual_mode_enabled:
+        _clear_refresh_cookie(response)
+    log_security_event(
+        event="auth_logout_all_success",
+        request=request,
+        status_code=status.HTTP_200_OK,
+        user_id=str(user_id)
+    )
+
+    return MessageResponse(
+        message="Sessões encerradas em todos os dispositivos"
+    )
+
+
 @router.get(
     "/me",
     response_model=UserLoginResponse,
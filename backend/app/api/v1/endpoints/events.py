@@ -0,0 +1,77 @@
+import asyncio
+import json
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.auth import CurrentUserDep
+from app.core.database import get_db
+from app.core.events import user_events
+from app.core.config import settings
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def _format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get(
+    "/stream",
+    summary="Stream de eventos do usuário (SSE)",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Eventos achievement_unlocked, personal_best e streak"
+        }
+    }
+)
+async def stream_user_events(
+    request: Request,
+    user_id: CurrentUserDep,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Server-sent events do usuário autenticado.
+
+    **Eventos:**
+    - `achievement_unlocked`: conquista desbloqueada
+    - `personal_best`: novo recorde de retenção
+    - `streak`: sequência de dias alterada
+
+    Substitui o polling de `/achievements/me` após cada sessão.
+    """
+    async def event_stream():
+        async with user_events.subscribe(str(user_id)) as queue:
+            yield f"retry: {settings.sse_retry_ms}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=settings.sse_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # heartbeat mantém proxies e load balancers com a conexão aberta
+                    yield ": ping\n\n"
+                    continue
+
+                yield _format_sse(message["event"], message["data"])
+
+    # Mesma sessão usada na autenticação (dependências são resolvidas uma
+    # vez por request). get_db só sai quando a resposta termina, que aqui é
+    # quando o stream fecha: devolve a conexão ao pool antes de começar.
+    await db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
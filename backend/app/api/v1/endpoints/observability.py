@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from app.core.metrics import security_metrics
+from app.core.metrics import security_metrics, cache_metrics
+from app.core.redis_client import cache, redis_breaker
+from app.core.cache_decorator import cache_registry
+from app.core.security import password_hasher
 
 router = APIRouter(prefix="/observability", tags=["Observability"])
 
@@ -13,4 +16,37 @@ async def get_security_metrics_summary():
     """
     Retorna um snapshot simples para acompanhamento diário.
     """
-    return security_metrics.snapshot()
\ No newline at end of file
+    return security_metrics.snapshot()
+
+
+@router.get(
+    "/password-hashing",
+    summary="Ocupação do pool de hashing de senhas"
+)
+async def get_password_hashing_summary():
+    """
+    Fila e latência do pool de bcrypt deste worker.
+    """
+    return password_hasher.snapshot()
+
+
+@router.get(
+    "/cache-metrics",
+    summary="Hit rate, latência e tamanho do cache por namespace"
+)
+async def get_cache_metrics_summary(
+    top: int = Query(10, ge=1, le=100, description="Namespaces em `hottest`")
+):
+    """
+    Por namespace de chave: hits/misses do L1 (se habilitado) e do Redis,
+    e contagem, erros, histograma de latência e tamanho de payload de
+    get/set/delete. `hottest` ordena os namespaces por número de operações.
+    """
+    snapshot = cache_metrics.snapshot(top=top)
+    snapshot["l1"] = cache.local.stats() if cache.local is not None else None
+    snapshot["redis_breaker"] = redis_breaker.snapshot()
+    snapshot["declared"] = {
+        name: {"key": spec.key, "ttl": spec.ttl, "tags": list(spec.tags)}
+        for name, spec in cache_registry.items()
+    }
+    return snapshot
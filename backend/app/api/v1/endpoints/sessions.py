@@ -17,6 +17,7 @@ from app.schemas.common import MessageResponse, PaginatedResponse
 from app.api.dependencies import SessionServiceDep, AchievementServiceDep
 from app.api.auth import CurrentUserDep
 from app.core.audit import log_security_event
+from app.core.events import user_events
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
@@ -36,7 +37,10 @@ async def create_session(
     achievement_service: AchievementServiceDep
 ):
     # Cria sessão
-    session = await session_service.create_session(user_id, session_data)
+    session, stat_changes = await session_service.create_session(
+        user_id,
+        session_data
+    )
     log_security_event(
         event="session_create_success",
         request=request,
@@ -44,13 +48,15 @@ async def create_session(
         user_id=str(user_id)
     )
     
-    # Verifica conquistas desbloqueadas
+    # Verifica conquistas apenas para as stats que mudaram
     newly_unlocked = await achievement_service.check_and_unlock_achievements(
-        user_id
+        user_id,
+        stat_changes=stat_changes
     )
     
-    # TODO: Retornar conquistas desbloqueadas em header ou campo extra
-    # Por enquanto, apenas auditamos
+    # Conquistas e mudanças de stats são entregues via SSE (/events/stream)
+    await _publish_session_events(str(user_id), session, stat_changes, newly_unlocked)
+
     if newly_unlocked:
         log_security_event(
             event="achievement_unlock_batch",
@@ -66,6 +72,43 @@ async def create_session(
     )
 
 
+async def _publish_session_events(
+    user_id: str,
+    session: SessionDetailResponse,
+    stat_changes: dict[str, tuple[int, int]],
+    newly_unlocked: list
+) -> None:
+    for achievement in newly_unlocked:
+        await user_events.publish(
+            user_id,
+            "achievement_unlocked",
+            achievement.model_dump(mode="json")
+        )
+
+    if session.is_personal_best and "best_retention_time" in stat_changes:
+        previous, current = stat_changes["best_retention_time"]
+        await user_events.publish(
+            user_id,
+            "personal_best",
+            {
+                "session_id": str(session.id),
+                "best_retention_time": current,
+                "previous_best_retention_time": previous
+            }
+        )
+
+    if "current_streak" in stat_changes or "longest_streak" in stat_changes:
+        await user_events.publish(
+            user_id,
+            "streak",
+            {
+                field: stat_changes[field][1]
+                for field in ("current_streak", "longest_streak")
+                if field in stat_changes
+            }
+        )
+
+
 @router.get(
     "",
     response_model=PaginatedResponse[SessionListItem],
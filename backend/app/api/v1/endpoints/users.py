@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from typing import Awaitable, Callable
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Request, Response, status, Query
+from pydantic import TypeAdapter
 
 from app.schemas.user import (
     UserUpdate,
     UserResponse,
     UserStatsResponse,
     UserProfile,
+    UserAdminUpdate,
     PublicUserStatsResponse
 )
 from app.schemas.common import MessageResponse
 from app.api.dependencies import UserServiceDep
-from app.api.auth import CurrentUserDep
+from app.api.auth import CurrentUserDep, CurrentAdminDep
+from app.core.http_cache import content_json_response
+from app.core.config import settings
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -120,40 +126,74 @@ async def delete_my_account(
 
 
 # leaderboards (nao requer autenticacao)
+_leaderboard_adapter = TypeAdapter(list[PublicUserStatsResponse])
+_not_modified = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "Conteúdo não modificado (ETag)"}
+}
+
+
+async def _leaderboard_response(
+    request: Request,
+    render: Callable[[], Awaitable[list]]
+) -> Response:
+    # ETag do conteúdo: o ranking vem do @cached, sem consulta no 304
+    return await content_json_response(
+        request,
+        settings.http_cache_leaderboard_max_age,
+        _leaderboard_adapter,
+        render
+    )
+
+
 @router.get(
     "/leaderboard/retention",
     response_model=list[PublicUserStatsResponse],
-    summary="Top usuários por tempo de retenção"
+    summary="Top usuários por tempo de retenção",
+    responses=_not_modified
 )
 async def leaderboard_by_retention(
+    request: Request,
     user_service: UserServiceDep,
     limit: int = Query(10, ge=1, le=100, description="Número de usuários")
 ):
-    return await user_service.get_top_by_retention(limit)
+    return await _leaderboard_response(
+        request,
+        lambda: user_service.get_top_by_retention(limit)
+    )
 
 
 @router.get(
     "/leaderboard/streak",
     response_model=list[PublicUserStatsResponse],
-    summary="Top usuários por sequência (streak)"
+    summary="Top usuários por sequência (streak)",
+    responses=_not_modified
 )
 async def leaderboard_by_streak(
+    request: Request,
     user_service: UserServiceDep,
     limit: int = Query(10, ge=1, le=100, description="Número de usuários")
 ):
-    return await user_service.get_top_by_streak(limit)
+    return await _leaderboard_response(
+        request,
+        lambda: user_service.get_top_by_streak(limit)
+    )
 
 
 @router.get(
     "/leaderboard/active",
     response_model=list[PublicUserStatsResponse],
-    summary="Usuários mais ativos"
+    summary="Usuários mais ativos",
+    responses=_not_modified
 )
 async def leaderboard_most_active(
+    request: Request,
     user_service: UserServiceDep,
     limit: int = Query(10, ge=1, le=100, description="Número de usuários")
 ):
-    return await user_service.get_most_active(limit)
+    return await _leaderboard_response(
+        request,
+        lambda: user_service.get_most_active(limit)
+    )
 
 
 # search
@@ -169,3 +209,37 @@ async def search_users(
     limit: int = Query(10, ge=1, le=50)
 ):
     return await user_service.search_users(q, limit)
+
+
+# admin routes
+@router.put(
+    "/admin/{target_user_id}/role",
+    response_model=MessageResponse,
+    summary="[ADMIN] Conceder ou remover papel de administrador",
+    responses={
+        status.HTTP_403_FORBIDDEN: {"description": "Acesso restrito a administradores"}
+    }
+)
+async def set_user_admin(
+    target_user_id: UUID,
+    role_update: UserAdminUpdate,
+    user_id: CurrentAdminDep,
+    user_service: UserServiceDep
+):
+    """
+    **[ADMIN ONLY]** Altera `is_admin` de um usuário.
+
+    Os access tokens do usuário são revogados na hora; o próximo refresh
+    emite tokens com o papel atualizado.
+    """
+    success = await user_service.set_admin(target_user_id, role_update.is_admin)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não encontrado"
+        )
+
+    return MessageResponse(
+        message="Papel de administrador atualizado com sucesso"
+    )
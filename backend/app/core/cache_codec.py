@@ -0,0 +1,129 @@
+import base64
+import json
+import zlib
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele o codec json usa a stdlib
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Formato: "~c1" + codec + compressão + corpo. Ex.: "~c1jn{...}", "~c1jz<base64>".
+# O cliente Redis decodifica respostas como texto, então corpos binários
+# (msgpack ou comprimidos) vão em base64. Payloads sem o header são JSON
+# puro gravado antes do codec e continuam legíveis.
+HEADER_PREFIX = "~c1"
+HEADER_LENGTH = len(HEADER_PREFIX) + 2
+
+# O id identifica o formato no Redis, não a biblioteca: orjson e json são
+# intercambiáveis
+CODEC_IDS = {"json": "j", "msgpack": "m"}
+COMPRESSION_IDS = {"none": "n", "zlib": "z", "lz4": "l"}
+
+
+class CacheCodecError(ValueError):
+    pass
+
+
+def _dumps_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _loads_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheCodec:
+    """
+    Serialização dos payloads do cache. Grava no formato configurado e lê
+    qualquer formato conhecido pelo header, então trocar de codec ou de
+    compressão não exige limpar o Redis.
+    """
+
+    def __init__(self, codec: str, compression: str, compress_min_bytes: int) -> None:
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Codec de cache desconhecido: {codec}")
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Compressão de cache desconhecida: {compression}")
+        if codec == "msgpack" and msgpack is None:
+            raise RuntimeError("cache_codec=msgpack requer o pacote msgpack")
+        if compression == "lz4" and lz4_frame is None:
+            raise RuntimeError("cache_compression=lz4 requer o pacote lz4")
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    def encode(self, value: Any) -> str:
+        """Levanta TypeError/ValueError se o valor não for serializável."""
+        if self.codec == "msgpack":
+            data = msgpack.packb(value, use_bin_type=True)
+        else:
+            data = _dumps_json(value)
+
+        compression = "none"
+        if self.compression != "none" and len(data) >= self.compress_min_bytes:
+            compression = self.compression
+            data = _compress(data, compression)
+
+        header = f"{HEADER_PREFIX}{CODEC_IDS[self.codec]}{COMPRESSION_IDS[compression]}"
+        if self.codec == "json" and compression == "none":
+            return header + data.decode("utf-8")
+        return header + base64.b64encode(data).decode("ascii")
+
+    def decode(self, payload: str) -> Any:
+        if not payload.startswith(HEADER_PREFIX):
+            try:
+                return json.loads(payload)
+            except json.JSONDecodeError as e:
+                raise CacheCodecError("Payload legado inválido") from e
+
+        codec_id = payload[len(HEADER_PREFIX)]
+        compression_id = payload[len(HEADER_PREFIX) + 1]
+        body = payload[HEADER_LENGTH:]
+
+        try:
+            if codec_id == "j" and compression_id == "n":
+                return _loads_json(body.encode("utf-8"))
+
+            data = base64.b64decode(body)
+            if compression_id == "z":
+                data = zlib.decompress(data)
+            elif compression_id == "l":
+                if lz4_frame is None:
+                    raise CacheCodecError("Payload lz4 sem o pacote lz4")
+                data = lz4_frame.decompress(data)
+            elif compression_id != "n":
+                raise CacheCodecError(f"Compressão desconhecida: {compression_id}")
+
+            if codec_id == "j":
+                return _loads_json(data)
+            if codec_id == "m":
+                if msgpack is None:
+                    raise CacheCodecError("Payload msgpack sem o pacote msgpack")
+                return msgpack.unpackb(data, raw=False)
+            raise CacheCodecError(f"Codec desconhecido: {codec_id}")
+        except CacheCodecError:
+            raise
+        except Exception as e:
+            raise CacheCodecError("Payload inválido") from e
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(data, 6)
+    return lz4_frame.compress(data)
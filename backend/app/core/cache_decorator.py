@@ -0,0 +1,94 @@
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from pydantic import TypeAdapter
+
+from app.core.redis_client import cache, build_tagged_key
+from app.core.config import settings
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass(frozen=True)
+class CacheSpec:
+    name: str
+    key: str
+    ttl: int
+    stale_ttl: int
+    tags: tuple[str, ...]
+
+
+# métodos declarados com @cached (nome qualificado -> spec)
+cache_registry: dict[str, CacheSpec] = {}
+
+
+def cached(
+    key: str,
+    ttl: int,
+    *,
+    model: Any = None,
+    tags: tuple[str, ...] = (),
+    stale_ttl: Optional[int] = None
+) -> Callable[[F], F]:
+    """
+    Cache-aside declarativo para métodos async de serviço.
+
+    `key` e `tags` são templates formatados com os argumentos da chamada
+    (ex.: "stats:{user_id}:summary"); a chave final leva a geração de cada
+    tag, então invalidar é `invalidate_tags` (ex.: invalidate_user_stats).
+    `model` é qualquer tipo aceito pelo TypeAdapter do pydantic (modelo,
+    `list[Modelo]`, `Modelo | None`); sem ele o retorno deve ser JSON puro.
+    Se o método tiver `use_cache=False` na chamada, vai direto ao banco.
+
+    Leitura via `cache.get_or_compute`: single-flight, stale-while-revalidate,
+    L1 e métricas por namespace vêm de lá.
+    """
+    adapter = TypeAdapter(model) if model is not None else None
+    effective_stale_ttl = (
+        settings.cache_stale_ttl_seconds if stale_ttl is None else stale_ttl
+    )
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+        spec = CacheSpec(
+            name=func.__qualname__,
+            key=key,
+            ttl=ttl,
+            stale_ttl=effective_stale_ttl,
+            tags=tuple(tags)
+        )
+        cache_registry[spec.name] = spec
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            if not params.get("use_cache", True):
+                return await func(*args, **kwargs)
+
+            cache_key = await build_tagged_key(
+                key.format(**params),
+                [tag.format(**params) for tag in tags]
+            )
+
+            async def compute() -> Any:
+                result = await func(*args, **kwargs)
+                if adapter is None:
+                    return result
+                return adapter.dump_python(result, mode="json")
+
+            value = await cache.get_or_compute(
+                cache_key,
+                compute,
+                ttl=ttl,
+                stale_ttl=effective_stale_ttl
+            )
+            return value if adapter is None else adapter.validate_python(value)
+
+        wrapper.cache_spec = spec
+        return wrapper
+
+    return decorator
@@ -0,0 +1,100 @@
+import logging
+import time
+
+logger = logging.getLogger("app.circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por worker.
+
+    closed: chamadas passam; `failure_threshold` falhas seguidas abrem o
+    circuito. open: chamadas são recusadas por `reset_timeout` segundos.
+    half_open: uma única chamada de teste passa; sucesso fecha o circuito,
+    falha reabre.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        # contadores para observabilidade
+        self._times_opened = 0
+        self._rejected = 0
+
+    def is_rejecting(self) -> bool:
+        """Consulta sem efeito colateral: a próxima chamada seria recusada?"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at < self.reset_timeout
+        if self.state == HALF_OPEN:
+            return self._probe_in_flight
+        return False
+
+    def allow_request(self) -> bool:
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._rejected += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self._probe_in_flight:
+            self._rejected += 1
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._consecutive_failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED
+            and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._times_opened += 1
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Chamada terminou sem veredito (ex.: request cancelado)."""
+        self._probe_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        log = logger.warning if state == OPEN else logger.info
+        log(
+            "circuit_breaker_state_changed",
+            extra={"event_data": {
+                "event": "circuit_breaker_state_changed",
+                "breaker": self.name,
+                "from": previous,
+                "to": state,
+                "consecutive_failures": self._consecutive_failures
+            }}
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self._times_opened,
+            "rejected_calls": self._rejected,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+        }
@@ -1,5 +1,6 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -23,6 +24,15 @@ class Settings(BaseSettings):
     csp_report_only_enabled: bool = True
     strict_cors_enabled: bool = False
     refresh_cookie_samesite: str = "lax"
+    refresh_max_devices: int = 10
+    refresh_reuse_grace_seconds: int = 30
+    token_denylist_bucket_seconds: int = 300
+    token_denylist_refresh_seconds: int = 5
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+    password_hash_retry_after_seconds: int = 2
+    user_status_local_ttl_seconds: int = 30
+    user_status_local_max_entries: int = 10000
 
     #cors
     cors_origins: str
@@ -35,27 +45,84 @@ class Settings(BaseSettings):
     postgres_db: str = "capybreath_db"
 
     # redis
+    # "memory": backend em processo (testes, benchmarks, instalação de um
+    # único worker); estado não é compartilhado entre workers
+    cache_backend: Literal["redis", "memory"] = "redis"
     redis_host: str = "localhost"
     redis_port: int = 6379
-    redis_password: str
+    redis_password: str = ""
     redis_db: int = 0
     redis_decode_responses: bool = True
+    redis_socket_timeout_seconds: float = 5.0
+    # conexões por worker; sem conexão livre, espera até o timeout
+    redis_max_connections: int = 10
+    redis_pool_timeout_seconds: float = 1.0
+    redis_breaker_failure_threshold: int = 5
+    redis_breaker_reset_seconds: float = 10.0
 
     # cache
     cache_ttl_stats: int = 300
     cache_ttl_user: int = 600
+    # status de autenticação: curto, é o que decide se um token ainda vale
+    cache_ttl_user_status: int = 60
+    achievement_catalog_check_seconds: float = 1.0
+    achievement_rarity_refresh_seconds: int = 60
+    cache_stale_ttl_seconds: int = 60
+    cache_compute_lock_seconds: float = 5.0
+    # precisa ser maior que o TTL das entradas versionadas
+    cache_generation_ttl_seconds: int = 86400
+    # payloads de get_json/set_json: json (orjson se instalado) ou msgpack;
+    # compressão none, zlib ou lz4 a partir de cache_compress_min_bytes
+    cache_codec: Literal["json", "msgpack"] = "json"
+    cache_compression: Literal["none", "zlib", "lz4"] = "zlib"
+    cache_compress_min_bytes: int = 1024
+    # Cache-Control das rotas públicas (catálogo e leaderboards): o ETag
+    # acompanha a versão do conteúdo, max-age define quanto CDN/browser
+    # servem sem revalidar
+    http_cache_catalog_max_age: int = 60
+    # leaderboards: também é o TTL do cache (@cached) do ranking
+    http_cache_leaderboard_max_age: int = 15
+    http_cache_stale_while_revalidate: int = 60
+    cache_l1_enabled: bool = False
+    cache_l1_ttl_seconds: float = 5.0
+    cache_l1_max_entries: int = 10000
+    cache_l1_max_bytes: int = 16 * 1024 * 1024
+
+    # server-sent events
+    sse_heartbeat_seconds: int = 15
+    sse_retry_ms: int = 5000
+
+    # jobs
+    achievement_backfill_batch_size: int = 1000
+    achievement_rarity_reconcile_seconds: int = 3600
 
     # pagination
     default_page_size: int = 20
     max_page_size: int = 100
 
     # rate limiting
+    rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
+    rate_limit_auth_per_minute: int = 10
+    rate_limit_public_per_minute: int = 120
+    rate_limit_local_max_keys: int = 10000
+    login_max_failures_per_account: int = 5
+    login_max_failures_per_ip: int = 20
+    login_failure_window_seconds: int = 900
+    login_lockout_base_seconds: int = 30
+    login_lockout_max_seconds: int = 3600
+    login_throttle_local_max_entries: int = 10000
 
     # logging
     log_level: str = "INFO"
 
 
+    @model_validator(mode="after")
+    def validate_redis_password(self) -> "Settings":
+        if self.cache_backend == "redis" and not self.redis_password:
+            raise ValueError("REDIS_PASSWORD é obrigatório com CACHE_BACKEND=redis")
+        return self
+
     @field_validator("refresh_cookie_samesite")
     @classmethod
     def validate_refresh_cookie_samesite(cls, value: str) -> str:
@@ -90,13 +157,19 @@ class Settings(BaseSettings):
     @property
     def cors_allow_headers(self) -> list[str]:
         if self.strict_cors_enabled:
-            return ["Authorization", "Content-Type", "X-Request-ID", "X-Auth-Mode"]
+            return [
+                "Authorization",
+                "Content-Type",
+                "X-Request-ID",
+                "X-Auth-Mode",
+                "If-None-Match",
+            ]
         return ["*"]
 
     @property
     def cors_expose_headers(self) -> list[str]:
         if self.strict_cors_enabled:
-            return ["X-Request-ID"]
+            return ["X-Request-ID", "ETag", "Retry-After"]
         return ["*"]
 
     @property
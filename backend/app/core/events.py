@@ -0,0 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from app.core.pubsub import pubsub_hub
+
+USER_EVENTS_CHANNEL = "events:user"
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class UserEventBroker:
+    """
+    Fan-out de eventos por usuário para as conexões SSE deste worker.
+
+    A publicação passa pelo Redis pub/sub, então um evento gerado em
+    qualquer worker chega a todas as conexões abertas do usuário.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    async def publish(
+        self,
+        user_id: str,
+        event: str,
+        data: dict[str, Any]
+    ) -> None:
+        await pubsub_hub.publish(
+            USER_EVENTS_CHANNEL,
+            {"user_id": user_id, "event": event, "data": data}
+        )
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def _dispatch(self, payload: dict[str, Any]) -> None:
+        queues = self._subscribers.get(payload.get("user_id"))
+        if not queues:
+            return
+
+        message = {"event": payload["event"], "data": payload["data"]}
+        for queue in queues:
+            if queue.full():
+                # Cliente lento: descarta o evento mais antigo
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+
+user_events = UserEventBroker()
+pubsub_hub.register(USER_EVENTS_CHANNEL, user_events._dispatch)
@@ -0,0 +1,92 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from app.core.local_cache import LocalCache
+from app.core.config import settings
+
+# corpo JSON já serializado por ETag: mesma versão, mesmos bytes
+# singleton por worker
+rendered_bodies = LocalCache(max_entries=256, max_bytes=4 * 1024 * 1024)
+
+
+def make_etag(*parts: str, weak: bool = True) -> str:
+    digest = hashlib.sha1(
+        "|".join(parts).encode("utf-8"),
+        usedforsecurity=False
+    ).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Comparação fraca de If-None-Match (RFC 9110 §13.1.2).
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def public_cache_control(max_age: int) -> str:
+    return (
+        f"public, max-age={max_age}, "
+        f"stale-while-revalidate={settings.http_cache_stale_while_revalidate}"
+    )
+
+
+async def public_json_response(
+    request: Request,
+    etag: str | None,
+    max_age: int,
+    adapter: TypeAdapter,
+    render: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Resposta de rota pública, cacheável por CDN e browser.
+
+    O ETag vem da versão do conteúdo, calculada antes de qualquer consulta:
+    If-None-Match igual responde 304 sem chamar `render`. Numa versão já
+    servida pelo worker, o corpo sai pronto de `rendered_bodies`. Sem ETag
+    (versão indisponível) vai só o Cache-Control.
+    """
+    headers = {"Cache-Control": public_cache_control(max_age)}
+    if etag is None:
+        body = adapter.dump_json(await render())
+        return Response(body, media_type="application/json", headers=headers)
+
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = rendered_bodies.get(etag)
+    if body is LocalCache.MISSING:
+        body = adapter.dump_json(await render())
+        rendered_bodies.set(etag, body, len(body), settings.cache_ttl_stats)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def content_json_response(
+    request: Request,
+    max_age: int,
+    adapter: TypeAdapter,
+    render: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Como public_json_response, mas o ETag vem do próprio corpo: para rotas
+    sem versão barata de consultar cujo `render` já sai do cache (@cached),
+    então o 304 também não toca o banco.
+    """
+    body = adapter.dump_json(await render())
+    etag = make_etag(body.decode("utf-8"))
+    headers = {"Cache-Control": public_cache_control(max_age), "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
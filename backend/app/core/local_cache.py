@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+
+class LocalCache:
+    """
+    LRU com TTL por entrada e limites de quantidade e de bytes.
+
+    Guarda valores já desserializados: quem lê não deve mutá-los.
+    O tamanho de cada entrada é o do payload serializado, informado
+    por quem grava.
+    """
+
+    MISSING = object()
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self.MISSING
+
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return self.MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        # Payload maior que um quarto do orçamento não compensa
+        if ttl <= 0 or size > self._max_bytes // 4:
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self._max_entries
+                or self._bytes > self._max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
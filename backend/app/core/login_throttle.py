@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from app.core.redis_client import cache
+from app.core.memory_backend import MemoryStore, register_script_handler
+from app.core.config import settings
+
+logger = logging.getLogger("app.login_throttle")
+
+# Conta falhas na janela e, a partir do limite, grava um lock com duração
+# exponencial (base * 2^(falhas - limite), até o máximo). Retorna o TTL do
+# lock em segundos (0 se não bloqueou).
+REGISTER_FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+if failures == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+end
+
+local threshold = tonumber(ARGV[2])
+if failures < threshold then
+    return 0
+end
+
+local lockout = math.floor(math.min(
+    tonumber(ARGV[3]) * math.pow(2, failures - threshold),
+    tonumber(ARGV[4])
+))
+redis.call('SET', KEYS[2], '1', 'EX', lockout)
+redis.call('EXPIRE', KEYS[1], math.max(tonumber(ARGV[1]), lockout))
+return lockout
+"""
+
+
+def _register_failure_in_memory(store: MemoryStore, keys: list[str], args: list) -> int:
+    window, threshold, base, maximum = (float(arg) for arg in args)
+    failures = store.incr(keys[0])
+    if failures == 1:
+        store.expire(keys[0], int(window))
+    if failures < threshold:
+        return 0
+
+    lockout = math.floor(min(base * 2 ** (failures - threshold), maximum))
+    store.set(keys[1], "1", ex=lockout)
+    store.expire(keys[0], int(max(window, lockout)))
+    return lockout
+
+
+register_script_handler(REGISTER_FAILURE_SCRIPT, _register_failure_in_memory)
+
+
+class LoginLockedOut(Exception):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Muitas tentativas de login")
+        self.retry_after_seconds = retry_after_seconds
+
+
+def _account_id(email: str) -> str:
+    # Não expõe o email nas chaves do Redis
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:32]
+
+
+class LoginThrottle:
+    """
+    Bloqueio progressivo de login por conta e por IP.
+
+    Locks conhecidos ficam espelhados num dict local, então rejeitar um
+    cliente já bloqueado não custa nem uma ida ao Redis. Sem Redis, as
+    falhas são contadas apenas neste worker.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._locks: OrderedDict[str, float] = OrderedDict()
+        self._local_failures: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def _subjects(self, email: str, ip: str | None) -> list[tuple[str, int]]:
+        subjects = [(f"account:{_account_id(email)}", settings.login_max_failures_per_account)]
+        if ip:
+            subjects.append((f"ip:{ip}", settings.login_max_failures_per_ip))
+        return subjects
+
+    async def check(self, email: str, ip: str | None) -> None:
+        """Levanta LoginLockedOut antes de qualquer verificação de senha."""
+        subjects = [subject for subject, _ in self._subjects(email, ip)]
+
+        now = time.monotonic()
+        retry_after = max(
+            (self._locks.get(subject, 0.0) - now for subject in subjects),
+            default=0.0
+        )
+        if retry_after > 0:
+            raise LoginLockedOut(math.ceil(retry_after))
+
+        # Locks criados por outros workers
+        for subject in subjects:
+            ttl = await cache.ttl(f"login_lock:{subject}")
+            if ttl > 0:
+                self._remember_lock(subject, ttl)
+                raise LoginLockedOut(ttl)
+
+    async def register_failure(self, email: str, ip: str | None) -> None:
+        for subject, threshold in self._subjects(email, ip):
+            lockout = await cache.run_script(
+                REGISTER_FAILURE_SCRIPT,
+                keys=[f"login_failures:{subject}", f"login_lock:{subject}"],
+                args=[
+                    settings.login_failure_window_seconds,
+                    threshold,
+                    settings.login_lockout_base_seconds,
+                    settings.login_lockout_max_seconds
+                ]
+            )
+            if lockout is None:
+                lockout = self._register_local_failure(subject, threshold)
+
+            if lockout:
+                self._remember_lock(subject, int(lockout))
+                logger.warning(
+                    "login_lockout",
+                    extra={"event_data": {
+                        "event": "login_lockout",
+                        "subject": subject.split(":", 1)[0],
+                        "lockout_seconds": int(lockout)
+                    }}
+                )
+
+    async def register_success(self, email: str) -> None:
+        subject = f"account:{_account_id(email)}"
+        self._local_failures.pop(subject, None)
+        await cache.delete(f"login_failures:{subject}")
+
+    def _remember_lock(self, subject: str, seconds: int) -> None:
+        self._locks[subject] = time.monotonic() + seconds
+        self._locks.move_to_end(subject)
+        while len(self._locks) > self._max_entries:
+            self._locks.popitem(last=False)
+
+    def _register_local_failure(self, subject: str, threshold: int) -> int:
+        now = time.monotonic()
+        failures, expires_at = self._local_failures.get(subject, (0, 0.0))
+        if expires_at <= now:
+            failures = 0
+            expires_at = now + settings.login_failure_window_seconds
+        failures += 1
+
+        lockout = 0
+        if failures >= threshold:
+            lockout = int(min(
+                settings.login_lockout_base_seconds * 2 ** (failures - threshold),
+                settings.login_lockout_max_seconds
+            ))
+            expires_at = max(expires_at, now + lockout)
+
+        self._local_failures[subject] = (failures, expires_at)
+        self._local_failures.move_to_end(subject)
+        while len(self._local_failures) > self._max_entries:
+            self._local_failures.popitem(last=False)
+        return lockout
+
+
+# singleton por worker
+login_throttle = LoginThrottle(max_entries=settings.login_throttle_local_max_entries)
@@ -0,0 +1,470 @@
+import asyncio
+import fnmatch
+import hashlib
+import time
+from typing import Any, AsyncIterator, Callable, Optional, Set
+
+from redis.exceptions import NoScriptError, ResponseError
+
+# Implementações Python dos scripts Lua, indexadas pelo texto do script.
+# Cada módulo registra a sua ao lado do Lua (register_script_handler).
+ScriptHandler = Callable[["MemoryStore", list[str], list[Any]], Any]
+_handlers_by_sha: dict[str, ScriptHandler] = {}
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+def register_script_handler(script: str, handler: ScriptHandler) -> None:
+    _handlers_by_sha[_sha(script)] = handler
+
+
+def _sha(script: str) -> str:
+    return hashlib.sha1(script.encode("utf-8")).hexdigest()
+
+
+def _encode(value: Any) -> str:
+    # Mesma conversão do redis-py com decode_responses=True
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class MemoryStore:
+    """
+    Subconjunto de comandos do Redis em memória, síncrono: cada comando (e
+    cada script) roda sem ceder o event loop, então é atômico como no Redis.
+    Expiração é preguiçosa, com uma varredura periódica das chaves com TTL.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._channels: dict[str, set[asyncio.Queue]] = {}
+        self._ops = 0
+
+    # chaves
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return False
+        return key in self._data
+
+    def _sweep(self) -> None:
+        self._ops += 1
+        if self._ops % self.SWEEP_EVERY:
+            return
+        now = time.time()
+        for key in [k for k, expires_at in self._expires.items() if expires_at <= now]:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def _read(self, key: str, kind: type) -> Any:
+        if not self._alive(key):
+            return None
+        value = self._data[key]
+        if type(value) is not kind:
+            raise ResponseError(WRONGTYPE)
+        return value
+
+    def _write(self, key: str, kind: type) -> Any:
+        self._sweep()
+        value = self._read(key, kind)
+        if value is None:
+            value = kind()
+            self._data[key] = value
+        return value
+
+    def _drop_if_empty(self, key: str) -> None:
+        if not self._data.get(key):
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self._data[key]
+                self._expires.pop(key, None)
+                removed += 1
+        return removed
+
+    def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    def expire(self, key: str, seconds: int) -> bool:
+        return self.pexpire(key, int(seconds) * 1000)
+
+    def pexpire(self, key: str, milliseconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.time() + int(milliseconds) / 1000
+        return True
+
+    def expireat(self, key: str, when: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires[key] = float(when)
+        return True
+
+    def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        expires_at = self._expires.get(key)
+        if expires_at is None:
+            return -1
+        return max(round(expires_at - time.time()), 0)
+
+    def scan(self, match: Optional[str] = None) -> list[str]:
+        return [
+            key for key in list(self._data)
+            if self._alive(key) and (match is None or fnmatch.fnmatchcase(key, match))
+        ]
+
+    def time(self) -> list[int]:
+        now = time.time()
+        return [int(now), int((now % 1) * 1_000_000)]
+
+    # strings
+    def get(self, key: str) -> Optional[str]:
+        return self._read(key, str)
+
+    def mget(self, keys: list[str]) -> list[Optional[str]]:
+        return [self.get(key) for key in keys]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ex: Optional[int] = None,
+        px: Optional[int] = None,
+        nx: bool = False
+    ) -> Optional[bool]:
+        self._sweep()
+        if nx and self._alive(key):
+            return None
+        self._data[key] = _encode(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        elif px is not None:
+            self.pexpire(key, px)
+        return True
+
+    def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return bool(self.set(key, value, ex=seconds))
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        current = self.get(key)
+        try:
+            value = int(current or 0) + int(amount)
+        except ValueError:
+            raise ResponseError("ERR value is not an integer or out of range")
+        # Como no Redis, o TTL da chave é mantido
+        self._sweep()
+        self._data[key] = str(value)
+        return value
+
+    def incr(self, key: str) -> int:
+        return self.incrby(key, 1)
+
+    # hashes
+    def hget(self, key: str, field: str) -> Optional[str]:
+        value = self._read(key, dict)
+        return None if value is None else value.get(field)
+
+    def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self._read(key, dict) or {})
+
+    def hmget(self, key: str, fields: list[str]) -> list[Optional[str]]:
+        value = self._read(key, dict) or {}
+        return [value.get(field) for field in fields]
+
+    def hset(
+        self,
+        key: str,
+        field: Optional[str] = None,
+        value: Any = None,
+        mapping: Optional[dict[str, Any]] = None
+    ) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        stored = self._write(key, dict)
+        added = sum(1 for item in items if item not in stored)
+        stored.update({item: _encode(item_value) for item, item_value in items.items()})
+        return added
+
+    def hdel(self, key: str, *fields: str) -> int:
+        stored = self._read(key, dict)
+        if stored is None:
+            return 0
+        removed = sum(1 for field in fields if stored.pop(field, None) is not None)
+        self._drop_if_empty(key)
+        return removed
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        stored = self._write(key, dict)
+        value = int(stored.get(field, 0)) + int(amount)
+        stored[field] = str(value)
+        return value
+
+    # sets
+    def sadd(self, key: str, *members: Any) -> int:
+        stored = self._write(key, set)
+        before = len(stored)
+        stored.update(_encode(member) for member in members)
+        return len(stored) - before
+
+    def srem(self, key: str, *members: Any) -> int:
+        stored = self._read(key, set)
+        if stored is None:
+            return 0
+        before = len(stored)
+        stored.difference_update(_encode(member) for member in members)
+        self._drop_if_empty(key)
+        return before - len(stored)
+
+    def smembers(self, key: str) -> Set[str]:
+        return set(self._read(key, set) or ())
+
+    # sorted sets (membro -> score)
+    def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        stored = self._write(key, _ZSet)
+        added = sum(1 for member in mapping if _encode(member) not in stored)
+        stored.update({_encode(member): float(score) for member, score in mapping.items()})
+        return added
+
+    def zincrby(self, key: str, amount: float, member: str) -> float:
+        stored = self._write(key, _ZSet)
+        member = _encode(member)
+        stored[member] = stored.get(member, 0.0) + float(amount)
+        return stored[member]
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        stored = self._read(key, _ZSet)
+        return None if stored is None else stored.get(_encode(member))
+
+    def zrem(self, key: str, *members: str) -> int:
+        stored = self._read(key, _ZSet)
+        if stored is None:
+            return 0
+        removed = sum(1 for member in members if stored.pop(_encode(member), None) is not None)
+        self._drop_if_empty(key)
+        return removed
+
+    def zcard(self, key: str) -> int:
+        return len(self._read(key, _ZSet) or ())
+
+    def zrange(
+        self,
+        key: str,
+        start: int,
+        end: int,
+        desc: bool = False,
+        withscores: bool = False
+    ) -> list[Any]:
+        stored = self._read(key, _ZSet) or {}
+        ordered = sorted(stored.items(), key=lambda item: (item[1], item[0]), reverse=desc)
+        stop = None if end == -1 else end + 1
+        selected = ordered[start:stop]
+        if withscores:
+            return [(member, score) for member, score in selected]
+        return [member for member, _ in selected]
+
+    def zrevrange(self, key: str, start: int, end: int, withscores: bool = False) -> list[Any]:
+        return self.zrange(key, start, end, desc=True, withscores=withscores)
+
+    # pub/sub
+    def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._channels.get(channel, ())
+        for queue in subscribers:
+            queue.put_nowait({
+                "type": "message",
+                "pattern": None,
+                "channel": channel,
+                "data": _encode(message),
+            })
+        return len(subscribers)
+
+    def _subscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        self._channels.setdefault(channel, set()).add(queue)
+
+    def _unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        subscribers = self._channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._channels[channel]
+
+    # scripts
+    def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+        handler = _handlers_by_sha.get(sha)
+        if handler is None:
+            raise NoScriptError("No matching script (sem implementação em memória)")
+        keys = [_encode(key) for key in keys_and_args[:numkeys]]
+        return handler(self, keys, list(keys_and_args[numkeys:]))
+
+
+class _ZSet(dict):
+    pass
+
+
+# comandos expostos pelo cliente e pelo pipeline
+COMMANDS = (
+    "delete", "exists", "expire", "pexpire", "expireat", "ttl", "time",
+    "get", "mget", "set", "setex", "incrby", "incr",
+    "hget", "hgetall", "hmget", "hset", "hdel", "hincrby",
+    "sadd", "srem", "smembers",
+    "zadd", "zincrby", "zscore", "zrem", "zcard", "zrange", "zrevrange",
+    "publish", "evalsha",
+)
+
+
+class MemoryScript:
+    def __init__(self, client: "InMemoryRedis", script: str) -> None:
+        self.client = client
+        self.script = script
+        self.sha = _sha(script)
+
+    async def __call__(
+        self,
+        keys: Optional[list[str]] = None,
+        args: Optional[list[Any]] = None,
+        client: Any = None
+    ) -> Any:
+        keys = keys or []
+        return await (client or self.client).evalsha(self.sha, len(keys), *keys, *(args or []))
+
+
+class MemoryPubSub:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._channels: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._store._subscribe(channel, self._queue)
+            self._channels.add(channel)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self._channels):
+            self._store._unsubscribe(channel, self._queue)
+            self._channels.discard(channel)
+
+    async def get_message(
+        self,
+        ignore_subscribe_messages: bool = False,
+        timeout: Optional[float] = 0.0
+    ) -> Optional[dict]:
+        try:
+            if not timeout:
+                return self._queue.get_nowait()
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class MemoryPipeline:
+    """Enfileira comandos e os executa em sequência, sem ceder o event loop."""
+
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+        self._stack: list[tuple[str, tuple, dict]] = []
+        # compatível com CachePipeline.run_script (Script com pipeline)
+        self.scripts: set = set()
+
+    def __getattr__(self, name: str) -> Callable[..., "MemoryPipeline"]:
+        if name not in COMMANDS:
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self._stack.append((name, args, kwargs))
+            return self
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._stack)
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.reset()
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        results: list[Any] = []
+        for name, args, kwargs in self._stack:
+            try:
+                results.append(getattr(self._store, name)(*args, **kwargs))
+            except ResponseError as e:
+                results.append(e)
+        self._stack = []
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, ResponseError):
+                    raise result
+        return results
+
+    async def reset(self) -> None:
+        self._stack = []
+
+
+class InMemoryRedis:
+    """
+    Substituto do cliente redis.asyncio para testes, benchmarks e
+    instalações de um único processo (cache_backend=memory). Cobre os
+    comandos usados pela aplicação; scripts Lua precisam de uma
+    implementação Python registrada com register_script_handler.
+    O estado é do processo: com vários workers cada um tem o seu.
+    """
+
+    def __init__(self) -> None:
+        self.store = MemoryStore()
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> MemoryPipeline:
+        return MemoryPipeline(self.store)
+
+    def register_script(self, script: str) -> MemoryScript:
+        return MemoryScript(self, script)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> MemoryPubSub:
+        return MemoryPubSub(self.store)
+
+    async def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None) -> AsyncIterator[str]:
+        for key in self.store.scan(match):
+            yield key
+
+    async def ping(self) -> bool:
+        return True
+
+    async def flushdb(self) -> bool:
+        self.store._data.clear()
+        self.store._expires.clear()
+        return True
+
+    async def close(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+def _client_command(name: str) -> Callable[..., Any]:
+    async def command(self: InMemoryRedis, *args: Any, **kwargs: Any) -> Any:
+        return getattr(self.store, name)(*args, **kwargs)
+    command.__name__ = name
+    return command
+
+
+for _name in COMMANDS:
+    setattr(InMemoryRedis, _name, _client_command(_name))
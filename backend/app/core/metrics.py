@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import re
+from bisect import bisect_left
 from collections import defaultdict
 from threading import Lock
 
+# Segmentos variáveis das chaves (UUIDs, ids numéricos, hashes)
+_KEY_ID_SEGMENT = re.compile(
+    r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+|[0-9a-f]{16,})$",
+    re.IGNORECASE
+)
+
 
 class SecurityMetricsStore:
     def __init__(self) -> None:
@@ -42,4 +50,155 @@ class SecurityMetricsStore:
             }
 
 
-security_metrics = SecurityMetricsStore()
\ No newline at end of file
+security_metrics = SecurityMetricsStore()
+
+
+def cache_namespace(key: str) -> str:
+    """`stats:<uuid>:summary` -> `stats:summary`."""
+    segments = [
+        segment for segment in key.split(":")
+        if not _KEY_ID_SEGMENT.match(segment)
+    ]
+    return ":".join(segments) or key
+
+
+# Limites superiores (ms) dos buckets de latência; acima do último vai em "+Inf"
+CACHE_LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class _OperationStats:
+    __slots__ = (
+        "count", "errors", "latency_sum", "latency_max", "buckets",
+        "sized", "bytes_sum", "bytes_max"
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(CACHE_LATENCY_BUCKETS_MS) + 1)
+        self.sized = 0
+        self.bytes_sum = 0
+        self.bytes_max = 0
+
+    def observe(self, latency_ms: float, size: int | None, error: bool) -> None:
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.latency_sum += latency_ms
+        self.latency_max = max(self.latency_max, latency_ms)
+        self.buckets[bisect_left(CACHE_LATENCY_BUCKETS_MS, latency_ms)] += 1
+        if size is not None:
+            self.sized += 1
+            self.bytes_sum += size
+            self.bytes_max = max(self.bytes_max, size)
+
+    def percentile(self, quantile: float) -> float | None:
+        """Limite superior do bucket que contém o quantil (None se +Inf)."""
+        target = quantile * self.count
+        cumulative = 0
+        for bound, amount in zip(CACHE_LATENCY_BUCKETS_MS, self.buckets):
+            cumulative += amount
+            if cumulative >= target:
+                return bound
+        return None
+
+    def snapshot(self) -> dict:
+        bounds = [str(bound) for bound in CACHE_LATENCY_BUCKETS_MS] + ["+Inf"]
+        data = {
+            "count": self.count,
+            "errors": self.errors,
+            "latency_ms": {
+                "avg": round(self.latency_sum / self.count, 3),
+                "max": round(self.latency_max, 3),
+                "p50": self.percentile(0.5),
+                "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99),
+                "buckets": dict(zip(bounds, self.buckets)),
+            },
+        }
+        if self.sized:
+            data["bytes"] = {
+                "avg": round(self.bytes_sum / self.sized),
+                "max": self.bytes_max,
+                "total": self.bytes_sum,
+            }
+        return data
+
+
+class CacheMetricsStore:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counters = defaultdict(lambda: defaultdict(int))
+        # namespace -> operação (get/set/delete) -> latência e tamanho
+        self._operations = defaultdict(dict)
+
+    def increment(self, key: str, counter: str) -> None:
+        with self._lock:
+            self._counters[cache_namespace(key)][counter] += 1
+
+    def observe(
+        self,
+        key: str,
+        operation: str,
+        seconds: float,
+        size: int | None = None,
+        error: bool = False
+    ) -> None:
+        """
+        Uma operação no Redis. Operações em lote (MGET, pipeline) contam
+        uma vez por chave, com a latência do lote. `size` é o payload em
+        bytes (valor lido ou gravado).
+        """
+        namespace = cache_namespace(key)
+        with self._lock:
+            stats = self._operations[namespace].get(operation)
+            if stats is None:
+                stats = self._operations[namespace][operation] = _OperationStats()
+            stats.observe(seconds * 1000, size, error)
+
+    def snapshot(self, top: int = 10) -> dict:
+        with self._lock:
+            namespaces = {}
+            for namespace in self._counters.keys() | self._operations.keys():
+                data = dict(self._counters.get(namespace, {}))
+                for tier in ("l1", "redis"):
+                    hits = data.get(f"{tier}_hits", 0)
+                    lookups = hits + data.get(f"{tier}_misses", 0)
+                    if lookups:
+                        data[f"{tier}_hit_rate"] = round(hits / lookups, 4)
+
+                operations = self._operations.get(namespace, {})
+                if operations:
+                    data["operations"] = {
+                        operation: stats.snapshot()
+                        for operation, stats in operations.items()
+                    }
+                namespaces[namespace] = data
+
+            # mais acessados primeiro: onde ajustar TTL faz diferença
+            load = {
+                namespace: (
+                    sum(stats.count for stats in operations.values()),
+                    sum(stats.latency_sum for stats in operations.values())
+                )
+                for namespace, operations in self._operations.items()
+            }
+            hottest = sorted(load.items(), key=lambda item: item[1], reverse=True)[:top]
+
+            return {
+                "namespaces": namespaces,
+                "hottest": [
+                    {
+                        "namespace": namespace,
+                        "operations": count,
+                        "latency_ms_total": round(latency, 3),
+                        "redis_hit_rate": namespaces[namespace].get("redis_hit_rate"),
+                    }
+                    for namespace, (count, latency) in hottest
+                ],
+            }
+
+
+cache_metrics = CacheMetricsStore()
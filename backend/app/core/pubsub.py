@@ -0,0 +1,118 @@
+import asyncio
+import inspect
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from app.core.redis_client import cache, CACHE_INVALIDATION_CHANNEL
+
+logger = logging.getLogger("app.pubsub")
+
+MessageHandler = Callable[[dict[str, Any]], Awaitable[None] | None]
+
+
+class PubSubHub:
+    """
+    Uma única assinatura Redis pub/sub por worker, compartilhada por
+    todos os consumidores (eventos SSE, invalidações de cache, etc.).
+
+    Handlers devem ser registrados antes de `start()`. Sem Redis, as
+    mensagens publicadas são entregues apenas aos handlers locais.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[MessageHandler]] = {}
+        self._task: asyncio.Task | None = None
+
+    def register(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, payload: dict[str, Any]) -> None:
+        published = await cache.publish(channel, json.dumps(payload))
+        if not published or self._task is None:
+            # Fallback: pelo menos este worker recebe a mensagem
+            await self._dispatch(channel, payload)
+
+    async def start(self) -> None:
+        if self._task is None and self._handlers and cache.redis is not None:
+            self._task = asyncio.create_task(self._listen(), name="pubsub_hub")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = cache.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*self._handlers)
+                backoff = 1.0
+                while True:
+                    # timeout curto: a leitura bloqueante estouraria o
+                    # socket_timeout do pool
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=1.0
+                    )
+                    if message is None:
+                        continue
+                    await self._handle_raw(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError):
+                logger.error(
+                    "pubsub_listener_error",
+                    extra={"event_data": {
+                        "event": "pubsub_listener_error",
+                        "retry_in_seconds": backoff
+                    }}
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+
+    async def _handle_raw(self, channel: str, data: str) -> None:
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        await self._dispatch(channel, payload)
+
+    async def _dispatch(self, channel: str, payload: dict[str, Any]) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(
+                    "pubsub_handler_error",
+                    extra={"event_data": {
+                        "event": "pubsub_handler_error",
+                        "channel": channel
+                    }}
+                )
+
+
+# singleton por worker
+pubsub_hub = PubSubHub()
+if cache.local is not None:
+    pubsub_hub.register(CACHE_INVALIDATION_CHANNEL, cache.handle_invalidation)
+
+
+async def init_pubsub() -> None:
+    await pubsub_hub.start()
+
+
+async def close_pubsub() -> None:
+    await pubsub_hub.stop()
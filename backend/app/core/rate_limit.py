@@ -0,0 +1,258 @@
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from jose import JWTError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.redis_client import cache
+from app.core.memory_backend import MemoryStore, register_script_handler
+from app.core.security import decode_token
+from app.core.config import settings
+
+logger = logging.getLogger("app.rate_limit")
+
+RATE_LIMIT_MESSAGE = "Muitas requisições, tente novamente em instantes"
+
+# Bucket em hash {tokens, ts}; o relógio é o do Redis, comum a todos os workers
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_after, math.floor(tokens)}
+"""
+
+
+def _token_bucket_in_memory(store: MemoryStore, keys: list[str], args: list) -> list[int]:
+    capacity, rate, cost = float(args[0]), float(args[1]), float(args[2])
+    seconds, microseconds = store.time()
+    now = seconds * 1000 + microseconds // 1000
+
+    raw_tokens, raw_ts = store.hmget(keys[0], ["tokens", "ts"])
+    tokens = float(raw_tokens) if raw_tokens is not None else capacity
+    ts = float(raw_ts) if raw_ts is not None else now
+    tokens = min(capacity, tokens + max(now - ts, 0) * rate)
+
+    allowed, retry_after = 0, 0
+    if tokens >= cost:
+        tokens -= cost
+        allowed = 1
+    else:
+        retry_after = math.ceil((cost - tokens) / rate)
+
+    store.hset(keys[0], mapping={"tokens": tokens, "ts": now})
+    store.pexpire(keys[0], math.ceil(capacity / rate))
+    return [allowed, retry_after, math.floor(tokens)]
+
+
+register_script_handler(TOKEN_BUCKET_SCRIPT, _token_bucket_in_memory)
+
+# Classes de rota: auth (bcrypt), public (sem autenticação) e default
+_AUTH_ROUTES = (
+    f"{settings.api_v1_prefix}/auth/login",
+    f"{settings.api_v1_prefix}/auth/register",
+    f"{settings.api_v1_prefix}/auth/refresh",
+)
+_PUBLIC_ROUTES = (
+    f"{settings.api_v1_prefix}/users/leaderboard",
+    f"{settings.api_v1_prefix}/achievements/category",
+    f"{settings.api_v1_prefix}/achievements/rarity",
+    f"{settings.api_v1_prefix}/achievements/stats",
+)
+_PUBLIC_EXACT_ROUTES = (
+    f"{settings.api_v1_prefix}/achievements",
+)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_seconds: int
+
+
+def classify_route(method: str, path: str) -> str | None:
+    """Classe de limite do request; None para rotas fora da API."""
+    if method == "OPTIONS" or not path.startswith(settings.api_v1_prefix):
+        return None
+    if path.startswith(_AUTH_ROUTES):
+        return "auth"
+    if path.startswith(_PUBLIC_ROUTES) or path.rstrip("/") in _PUBLIC_EXACT_ROUTES:
+        return "public"
+    return "default"
+
+
+def get_route_limit(route_class: str) -> int:
+    if route_class == "auth":
+        return settings.rate_limit_auth_per_minute
+    if route_class == "public":
+        return settings.rate_limit_public_per_minute
+    return settings.rate_limit_per_minute
+
+
+class LocalTokenBucket:
+    """
+    Fallback por worker quando o Redis está fora. Mesmo algoritmo do
+    script Lua; mantém no máximo `max_keys` buckets (LRU).
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, capacity: int, rate_per_ms: float) -> tuple[bool, int, int]:
+        now = time.monotonic() * 1000
+        tokens, ts = self._buckets.get(key, (float(capacity), now))
+        tokens = min(capacity, tokens + max(now - ts, 0) * rate_per_ms)
+
+        if tokens >= 1:
+            tokens -= 1
+            allowed, retry_after_ms = True, 0
+        else:
+            allowed, retry_after_ms = False, math.ceil((1 - tokens) / rate_per_ms)
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, retry_after_ms, math.floor(tokens)
+
+
+class RateLimiter:
+    def __init__(self) -> None:
+        self._local = LocalTokenBucket(settings.rate_limit_local_max_keys)
+
+    async def hit(self, key: str, limit: int) -> RateLimitDecision:
+        # Capacidade = limite por minuto (burst), reposição contínua
+        rate_per_ms = limit / 60000
+        result = await cache.run_script(
+            TOKEN_BUCKET_SCRIPT,
+            keys=[key],
+            args=[limit, rate_per_ms, 1]
+        )
+
+        if result is None:
+            allowed, retry_after_ms, remaining = self._local.consume(
+                key,
+                limit,
+                rate_per_ms
+            )
+        else:
+            allowed, retry_after_ms, remaining = bool(result[0]), int(result[1]), int(result[2])
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(remaining, 0),
+            retry_after_seconds=max(math.ceil(retry_after_ms / 1000), 1) if not allowed else 0
+        )
+
+
+rate_limiter = RateLimiter()
+
+
+def _get_header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _identify(scope: Scope, route_class: str) -> str:
+    """
+    Usuário autenticado (assinatura válida) tem bucket próprio; demais
+    requests, e sempre as rotas de auth, são limitados por IP.
+    """
+    if route_class != "auth":
+        authorization = _get_header(scope, b"authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            try:
+                subject = decode_token(authorization[7:]).get("sub")
+            except JWTError:
+                subject = None
+            if subject:
+                return f"user:{subject}"
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI puro (não bufferiza respostas, compatível com SSE).
+
+    Registrado antes do CORS para que os 429 também levem os headers de
+    CORS; o middleware de logging contabiliza os bloqueios nas métricas.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_route(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        identity = _identify(scope, route_class)
+        decision = await rate_limiter.hit(
+            f"ratelimit:{route_class}:{identity}",
+            get_route_limit(route_class)
+        )
+
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning(
+            "rate_limit_blocked",
+            extra={"event_data": {
+                "event": "rate_limit_blocked",
+                "route_class": route_class,
+                "identity": identity,
+                "path": scope["path"],
+                "retry_after_seconds": decision.retry_after_seconds
+            }}
+        )
+
+        body = json.dumps({"detail": RATE_LIMIT_MESSAGE}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(decision.retry_after_seconds).encode()),
+                (b"x-ratelimit-limit", str(decision.limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
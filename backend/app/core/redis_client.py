@@ -1,34 +1,193 @@
+import asyncio
 import json
 import logging
-from typing import Any, Optional
+import math
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Set
 from redis.asyncio import Redis, ConnectionPool
-from redis.exceptions import RedisError
+from redis.asyncio.client import Pipeline
+from redis.exceptions import (
+    ConnectionError as RedisConnectionError,
+    RedisError,
+    ResponseError,
+    TimeoutError as RedisTimeoutError
+)
 from app.core.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.memory_backend import InMemoryRedis, MemoryStore, register_script_handler
+from app.core.cache_codec import CacheCodec, CacheCodecError
+from app.core.local_cache import LocalCache
+from app.core.metrics import cache_metrics
 logger = logging.getLogger("app.redis")
 
+# invalidação do L1 entre workers
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# _single_flight sem espera: outro caller já está recalculando
+_NOT_REFRESHED = object()
+
+# libera o lock de recomputação só se ainda for do dono
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+def _release_lock_in_memory(store: MemoryStore, keys: list[str], args: list[Any]) -> int:
+    if store.get(keys[0]) == str(args[0]):
+        return store.delete(keys[0])
+    return 0
+
+register_script_handler(RELEASE_LOCK_SCRIPT, _release_lock_in_memory)
+
+class PoolExhaustedError(RedisConnectionError):
+    """Nenhuma conexão livre no pool do worker: não diz nada sobre o Redis."""
+
+
+class WaitingConnectionPool(ConnectionPool):
+    """
+    Pool que espera até `timeout` segundos por uma conexão livre em vez
+    de falhar na hora. Só a espera conta para esse timeout (o connect tem o
+    seu), e o estouro levanta PoolExhaustedError, que não abre o circuito.
+    """
+
+    def __init__(self, timeout: float, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.timeout = timeout
+        self._condition = asyncio.Condition()
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self._condition:
+                    await self._condition.wait_for(self.can_get_connection)
+                    try:
+                        connection = self._available_connections.pop()
+                    except IndexError:
+                        connection = self.make_connection()
+                    self._in_use_connections.add(connection)
+        except TimeoutError as e:
+            raise PoolExhaustedError(
+                f"Pool do Redis esgotado ({self.max_connections} conexões)"
+            ) from e
+
+        try:
+            await self.ensure_connection(connection)
+        except BaseException:
+            await self.release(connection)
+            raise
+        return connection
+
+    async def release(self, connection) -> None:
+        async with self._condition:
+            await super().release(connection)
+            self._condition.notify()
+
+
 # redis connection pool
-redis_pool = ConnectionPool.from_url(
+redis_pool = WaitingConnectionPool.from_url(
     settings.redis_url,
-    max_connections=10,
+    max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout_seconds,
     decode_responses=True,
-    socket_connect_timeout=5,
-    socket_timeout=5,
+    socket_connect_timeout=settings.redis_socket_timeout_seconds,
+    socket_timeout=settings.redis_socket_timeout_seconds,
     retry_on_timeout=True,
     health_check_interval=30
 )
 
+# Falhas de conexão/timeout seguidas abrem o circuito e o cache passa a
+# responder como "Redis indisponível" sem esperar o socket_timeout
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.redis_breaker_failure_threshold,
+    reset_timeout=settings.redis_breaker_reset_seconds
+)
+
+
+class CircuitOpenError(RedisConnectionError):
+    pass
+
+
+async def _guarded(call: Callable[[], Awaitable[Any]]) -> Any:
+    if not redis_breaker.allow_request():
+        raise CircuitOpenError("Circuito do Redis aberto")
+    try:
+        result = await call()
+    except PoolExhaustedError:
+        # Rajada local de chamadas concorrentes; o Redis pode estar saudável
+        redis_breaker.release()
+        raise
+    except (RedisConnectionError, RedisTimeoutError):
+        redis_breaker.record_failure()
+        raise
+    except ResponseError:
+        # O servidor respondeu (ex.: NOSCRIPT, WRONGTYPE)
+        redis_breaker.record_success()
+        raise
+    except BaseException:
+        redis_breaker.release()
+        raise
+    redis_breaker.record_success()
+    return result
+
+
+class GuardedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        return await _guarded(lambda: super(GuardedPipeline, self).execute(raise_on_error))
+
+
+class GuardedRedis(Redis):
+    """Cliente com todos os comandos e pipelines passando pelo breaker."""
+
+    async def execute_command(self, *args, **options):
+        return await _guarded(lambda: super(GuardedRedis, self).execute_command(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return GuardedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint
+        )
+
+
 # redis client
 async def get_redis() -> Redis:
-    return Redis(connection_pool=redis_pool)
+    if settings.cache_backend == "memory":
+        return InMemoryRedis()
+    return GuardedRedis(connection_pool=redis_pool)
 
 class RedisCache:
     def __init__(self):
         self.redis: Optional[Redis] = None
+        self._scripts: dict[str, Any] = {}
+        # formato dos payloads de get_json/set_json
+        self.codec = CacheCodec(
+            settings.cache_codec,
+            settings.cache_compression,
+            settings.cache_compress_min_bytes
+        )
+        # L1 opcional por worker para get_json/set_json
+        self.local: Optional[LocalCache] = None
+        if settings.cache_l1_enabled:
+            self.local = LocalCache(
+                max_entries=settings.cache_l1_max_entries,
+                max_bytes=settings.cache_l1_max_bytes
+            )
+        self._instance_id = uuid.uuid4().hex
+        # single-flight por worker (get_or_compute)
+        self._inflight: dict[str, asyncio.Future] = {}
 
     def _is_available(self) -> bool:
         if self.redis is None:
             return False
-        return True
+        # circuito aberto: falha rápido, sem logar erro por chamada
+        return not redis_breaker.is_rejecting()
     
     async def connect(self) -> None:
         self.redis = await get_redis()
@@ -40,14 +199,23 @@ class RedisCache:
     async def get(self, key: str) -> Optional[str]:
         if not self._is_available():
             return None
+        started = time.perf_counter()
         try:
-            return await self.redis.get(key)
+            value = await self.redis.get(key)
         except RedisError:
+            cache_metrics.observe(key, "get", time.perf_counter() - started, error=True)
             logger.error(
                 "redis_get_error",
                 extra={"event_data": {"event": "redis_get_error", "key": key}}
             )
             return None
+        cache_metrics.observe(
+            key,
+            "get",
+            time.perf_counter() - started,
+            size=len(value) if value is not None else None
+        )
+        return value
     
     async def set(
             self,
@@ -57,13 +225,18 @@ class RedisCache:
     ) -> bool:
         if not self._is_available():
             return False
+        started = time.perf_counter()
         try:
             if ttl:
                 await self.redis.setex(key, ttl, value)
             else:
                 await self.redis.set(key, value)
+            cache_metrics.observe(key, "set", time.perf_counter() - started, size=len(value))
             return True
         except RedisError:
+            cache_metrics.observe(
+                key, "set", time.perf_counter() - started, size=len(value), error=True
+            )
             logger.error(
                 "redis_set_error",
                 extra={"event_data": {"event": "redis_set_error", "key": key}}
@@ -71,12 +244,25 @@ class RedisCache:
             return False
         
     async def get_json(self, key: str) -> Optional[dict]:
+        if self.local is not None:
+            local_value = self.local.get(key)
+            if local_value is not LocalCache.MISSING:
+                cache_metrics.increment(key, "l1_hits")
+                return local_value
+            cache_metrics.increment(key, "l1_misses")
+
         value = await self.get(key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                parsed = self.codec.decode(value)
+            except CacheCodecError:
                 return None
+            cache_metrics.increment(key, "redis_hits")
+            if self.local is not None:
+                self.local.set(key, parsed, len(value), settings.cache_l1_ttl_seconds)
+            return parsed
+
+        cache_metrics.increment(key, "redis_misses")
         return None
     
     async def set_json(
@@ -85,29 +271,158 @@ class RedisCache:
         value: dict,
         ttl: Optional[int] = None
     ) -> bool:
+        if self.local is not None:
+            # SET e aviso aos outros workers no mesmo round trip
+            async with self.pipeline() as pipe:
+                pipe.set_json(key, value, ttl)
+            return pipe.succeeded
+
         try:
-            json_str = json.dumps(value)
-            return await self.set(key, json_str, ttl)
+            payload = self.codec.encode(value)
         except (TypeError, ValueError):
             logger.error(
                 "json_serialization_error",
                 extra={"event_data": {"event": "json_serialization_error"}}
             )
             return False
+        return await self.set(key, payload, ttl)
         
     async def delete(self, key: str) -> bool:
+        if self.local is not None:
+            self.local.delete(key)
+            await self._publish_invalidation({"keys": [key]})
         if not self._is_available():
             return False
+        started = time.perf_counter()
         try:
             result = await self.redis.delete(key)
+            cache_metrics.observe(key, "delete", time.perf_counter() - started)
             return result > 0
         except RedisError:
+            cache_metrics.observe(key, "delete", time.perf_counter() - started, error=True)
             logger.error(
                 "redis_delete_error",
                 extra={"event_data": {"event": "redis_delete_error", "key": key}}
             )
             return False
     
+    # multi-chave: um round trip para N chaves
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        if not self._is_available() or not keys:
+            return [None] * len(keys)
+        started = time.perf_counter()
+        try:
+            values = await self.redis.mget(keys)
+        except RedisError:
+            elapsed = time.perf_counter() - started
+            for key in keys:
+                cache_metrics.observe(key, "get", elapsed, error=True)
+            logger.error(
+                "redis_mget_error",
+                extra={"event_data": {"event": "redis_mget_error", "keys": len(keys)}}
+            )
+            return [None] * len(keys)
+        elapsed = time.perf_counter() - started
+        for key, value in zip(keys, values):
+            cache_metrics.observe(
+                key, "get", elapsed, size=len(value) if value is not None else None
+            )
+        return values
+
+    async def get_many_json(self, keys: list[str]) -> list[Optional[dict]]:
+        """Como get_json para várias chaves; só as ausentes do L1 vão ao Redis."""
+        results: list[Optional[dict]] = [None] * len(keys)
+        pending: list[int] = []
+        for index, key in enumerate(keys):
+            if self.local is not None:
+                local_value = self.local.get(key)
+                if local_value is not LocalCache.MISSING:
+                    cache_metrics.increment(key, "l1_hits")
+                    results[index] = local_value
+                    continue
+                cache_metrics.increment(key, "l1_misses")
+            pending.append(index)
+
+        values = await self.get_many([keys[index] for index in pending])
+        for index, value in zip(pending, values):
+            key = keys[index]
+            if not value:
+                cache_metrics.increment(key, "redis_misses")
+                continue
+            try:
+                parsed = self.codec.decode(value)
+            except CacheCodecError:
+                continue
+            cache_metrics.increment(key, "redis_hits")
+            if self.local is not None:
+                self.local.set(key, parsed, len(value), settings.cache_l1_ttl_seconds)
+            results[index] = parsed
+        return results
+
+    async def set_many(
+        self,
+        mapping: dict[str, str],
+        ttl: Optional[int] = None
+    ) -> bool:
+        if not mapping:
+            return False
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ttl)
+        return pipe.succeeded
+
+    async def set_many_json(
+        self,
+        mapping: dict[str, dict],
+        ttl: Optional[int] = None
+    ) -> bool:
+        if not mapping:
+            return False
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set_json(key, value, ttl)
+        return pipe.succeeded
+
+    async def delete_many(self, keys: list[str]) -> int:
+        if not keys:
+            return 0
+        if self.local is not None:
+            for key in keys:
+                self.local.delete(key)
+            await self._publish_invalidation({"keys": list(keys)})
+        if not self._is_available():
+            return 0
+        started = time.perf_counter()
+        try:
+            deleted = await self.redis.delete(*keys)
+        except RedisError:
+            elapsed = time.perf_counter() - started
+            for key in keys:
+                cache_metrics.observe(key, "delete", elapsed, error=True)
+            logger.error(
+                "redis_delete_many_error",
+                extra={"event_data": {"event": "redis_delete_many_error", "keys": len(keys)}}
+            )
+            return 0
+        elapsed = time.perf_counter() - started
+        for key in keys:
+            cache_metrics.observe(key, "delete", elapsed)
+        return deleted
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator["CachePipeline"]:
+        """
+        Escritas enfileiradas e enviadas num único round trip ao sair do
+        bloco (não é enviado se o bloco levantar exceção):
+
+            async with cache.pipeline() as pipe:
+                pipe.set_json(key, value, ttl=60)
+                pipe.increment(counter_key)
+        """
+        pipe = CachePipeline(self)
+        yield pipe
+        await pipe.execute()
+
     async def exists(self, key: str) -> bool:
         if not self._is_available():
             return False
@@ -156,7 +471,190 @@ class RedisCache:
             )
             return 0
         
+    async def hgetall(self, key: str) -> dict[str, str]:
+        if not self._is_available():
+            return {}
+        try:
+            return await self.redis.hgetall(key)
+        except RedisError:
+            logger.error(
+                "redis_hgetall_error",
+                extra={"event_data": {"event": "redis_hgetall_error", "key": key}}
+            )
+            return {}
+
+    async def hmget(self, key: str, fields: list[str]) -> list[Optional[str]]:
+        if not self._is_available():
+            return [None] * len(fields)
+        try:
+            return await self.redis.hmget(key, fields)
+        except RedisError:
+            logger.error(
+                "redis_hmget_error",
+                extra={"event_data": {"event": "redis_hmget_error", "key": key}}
+            )
+            return [None] * len(fields)
+
+    async def hset_many(
+        self,
+        key: str,
+        mapping: dict[str, str],
+        ttl: Optional[int] = None
+    ) -> bool:
+        if not self._is_available() or not mapping:
+            return False
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=mapping)
+                if ttl:
+                    pipe.expire(key, ttl)
+                await pipe.execute()
+            return True
+        except RedisError:
+            logger.error(
+                "redis_hset_error",
+                extra={"event_data": {"event": "redis_hset_error", "key": key}}
+            )
+            return False
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        if not self._is_available():
+            return 0
+        try:
+            return await self.redis.hdel(key, *fields)
+        except RedisError:
+            logger.error(
+                "redis_hdel_error",
+                extra={"event_data": {"event": "redis_hdel_error", "key": key}}
+            )
+            return 0
+
+    async def hincrby_many(
+        self,
+        key: str,
+        increments: dict[str, int]
+    ) -> bool:
+        if not self._is_available() or not increments:
+            return False
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for field, amount in increments.items():
+                    pipe.hincrby(key, field, amount)
+                await pipe.execute()
+            return True
+        except RedisError:
+            logger.error(
+                "redis_hincrby_error",
+                extra={"event_data": {"event": "redis_hincrby_error", "key": key}}
+            )
+            return False
+
+    async def replace_hash(self, key: str, mapping: dict[str, str]) -> bool:
+        if not self._is_available():
+            return False
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if mapping:
+                    pipe.hset(key, mapping=mapping)
+                await pipe.execute()
+            return True
+        except RedisError:
+            logger.error(
+                "redis_replace_hash_error",
+                extra={"event_data": {"event": "redis_replace_hash_error", "key": key}}
+            )
+            return False
+
+    async def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        if not self._is_available():
+            return False
+        try:
+            return bool(await self.redis.set(key, value, ex=ttl, nx=True))
+        except RedisError:
+            logger.error(
+                "redis_set_nx_error",
+                extra={"event_data": {"event": "redis_set_nx_error", "key": key}}
+            )
+            return False
+
+    async def sadd_many(
+        self,
+        key: str,
+        members: list[str],
+        expire_at: int | None = None
+    ) -> bool:
+        if not self._is_available() or not members:
+            return False
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.sadd(key, *members)
+                if expire_at is not None:
+                    pipe.expireat(key, expire_at)
+                await pipe.execute()
+            return True
+        except RedisError:
+            logger.error(
+                "redis_sadd_error",
+                extra={"event_data": {"event": "redis_sadd_error", "key": key}}
+            )
+            return False
+
+    async def smembers(self, key: str) -> Optional[Set[str]]:
+        """None indica Redis indisponível (diferente de conjunto vazio)."""
+        if not self._is_available():
+            return None
+        try:
+            return await self.redis.smembers(key)
+        except RedisError:
+            logger.error(
+                "redis_smembers_error",
+                extra={"event_data": {"event": "redis_smembers_error", "key": key}}
+            )
+            return None
+
+    async def run_script(
+        self,
+        script: str,
+        keys: list[str],
+        args: list[Any]
+    ) -> Any:
+        """Executa um script Lua (EVALSHA, com fallback para EVAL)."""
+        if not self._is_available():
+            return None
+        try:
+            return await self._get_script(script)(keys=keys, args=args)
+        except RedisError:
+            logger.error(
+                "redis_script_error",
+                extra={"event_data": {"event": "redis_script_error", "keys": keys}}
+            )
+            return None
+
+    def _get_script(self, script: str) -> Any:
+        runner = self._scripts.get(script)
+        if runner is None:
+            runner = self.redis.register_script(script)
+            self._scripts[script] = runner
+        return runner
+
+    async def publish(self, channel: str, message: str) -> bool:
+        if not self._is_available():
+            return False
+        try:
+            await self.redis.publish(channel, message)
+            return True
+        except RedisError:
+            logger.error(
+                "redis_publish_error",
+                extra={"event_data": {"event": "redis_publish_error", "channel": channel}}
+            )
+            return False
+
     async def delete_pattern(self, pattern: str) -> int:
+        if self.local is not None:
+            self._invalidate_local_pattern(pattern)
+            await self._publish_invalidation({"pattern": pattern})
         if not self._is_available():
             return 0
         try:
@@ -174,6 +672,298 @@ class RedisCache:
             )
             return 0
 
+    # read-through com proteção contra stampede
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        *,
+        stale_ttl: int = 0,
+        beta: float = 1.0
+    ) -> Any:
+        """
+        Lê `key` ou calcula com `compute()` (que deve retornar um valor
+        serializável em JSON, incluindo None).
+
+        - single-flight: um único `compute()` por chave neste worker e,
+          via lock curto no Redis, entre workers; os demais aguardam;
+        - stale-while-revalidate: por até `stale_ttl`s após expirar, quem
+          pega o lock recalcula e os demais recebem o valor antigo;
+        - XFetch: perto da expiração cada leitura decide, com probabilidade
+          crescente e proporcional ao custo do cálculo, recalcular antes.
+
+        O recálculo acontece sempre no próprio request (compute costuma usar
+        a sessão de banco dele). O valor vai num envelope {"v", "d", "e"}:
+        valor, duração do cálculo e expiração lógica (epoch); o TTL no Redis
+        é `ttl + stale_ttl`.
+        """
+        envelope = await self.get_json(key)
+        if _is_envelope(envelope):
+            now = time.time()
+            if now < envelope["e"]:
+                # XFetch: -d * beta * ln(U) é sempre >= 0
+                early = now - envelope["d"] * beta * math.log(random.random() or 1e-12)
+                if early < envelope["e"]:
+                    return envelope["v"]
+                refreshed = await self._single_flight(key, compute, ttl, stale_ttl, wait=False)
+                return envelope["v"] if refreshed is _NOT_REFRESHED else refreshed
+
+            if now < envelope["e"] + stale_ttl:
+                refreshed = await self._single_flight(key, compute, ttl, stale_ttl, wait=False)
+                return envelope["v"] if refreshed is _NOT_REFRESHED else refreshed
+
+        return await self._single_flight(key, compute, ttl, stale_ttl, wait=True)
+
+    async def _single_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        wait: bool
+    ) -> Any:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if not wait:
+                return _NOT_REFRESHED
+            # asyncio.wait não propaga o cancelamento de quem está calculando
+            await asyncio.wait([inflight])
+            # Dono cancelado, ou refresh antecipado que perdeu o lock para
+            # outro worker (não tem valor para entregar): tenta de novo
+            if inflight.cancelled() or inflight.result() is _NOT_REFRESHED:
+                return await self._single_flight(key, compute, ttl, stale_ttl, wait)
+            return inflight.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._compute_with_lock(key, compute, ttl, stale_ttl, wait)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # evita "Future exception was never retrieved" sem aguardadores
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _compute_with_lock(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        wait: bool
+    ) -> Any:
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        acquired = await self._acquire_lock(lock_key, token)
+
+        if not acquired:
+            if not wait:
+                # outro worker já está recalculando: serve o valor antigo
+                return _NOT_REFRESHED
+            # Aguarda o dono do lock publicar o valor; se ele falhar (lock
+            # liberado sem valor), assume o cálculo
+            deadline = time.monotonic() + settings.cache_compute_lock_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                envelope = await self.get_json(key)
+                if _is_envelope(envelope) and time.time() < envelope["e"] + stale_ttl:
+                    return envelope["v"]
+                acquired = await self._acquire_lock(lock_key, token)
+                if acquired:
+                    break
+
+        try:
+            started_at = time.perf_counter()
+            value = await compute()
+            duration = time.perf_counter() - started_at
+            await self.set_json(
+                key,
+                {"v": value, "d": round(duration, 4), "e": time.time() + ttl},
+                ttl=ttl + stale_ttl
+            )
+            return value
+        finally:
+            if acquired:
+                await self.run_script(RELEASE_LOCK_SCRIPT, keys=[lock_key], args=[token])
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        # Sem Redis não há coordenação entre workers: segue só o single-flight local
+        if not self._is_available():
+            return True
+        try:
+            return bool(await self.redis.set(
+                lock_key,
+                token,
+                nx=True,
+                px=int(settings.cache_compute_lock_seconds * 1000)
+            ))
+        except RedisError:
+            return True
+
+    # L1
+    def _invalidate_local_pattern(self, pattern: str) -> None:
+        prefix, wildcard, _ = pattern.partition("*")
+        if wildcard:
+            self.local.delete_prefix(prefix)
+        else:
+            self.local.delete(pattern)
+
+    def _invalidation_message(self, payload: dict) -> str:
+        payload["origin"] = self._instance_id
+        return json.dumps(payload)
+
+    async def _publish_invalidation(self, payload: dict) -> None:
+        await self.publish(CACHE_INVALIDATION_CHANNEL, self._invalidation_message(payload))
+
+    def handle_invalidation(self, payload: dict) -> None:
+        """Handler do pub/sub: descarta entradas alteradas por outro worker."""
+        if self.local is None or payload.get("origin") == self._instance_id:
+            return
+        for key in payload.get("keys", ()):
+            self.local.delete(key)
+        if payload.get("pattern"):
+            self._invalidate_local_pattern(payload["pattern"])
+
+class CachePipeline:
+    """
+    Comandos de escrita do RedisCache enfileirados num pipeline sem
+    transação (cada comando é independente). Como no RedisCache, falhas
+    do Redis são logadas e não propagam: `succeeded` indica o resultado.
+    O L1 é atualizado e a invalidação entre workers vai no mesmo envio.
+    """
+
+    def __init__(self, cache: RedisCache) -> None:
+        self._cache = cache
+        self._pipe: Optional[Pipeline] = (
+            cache.redis.pipeline(transaction=False) if cache._is_available() else None
+        )
+        self._local_sets: list[tuple[str, Any, int, Optional[int]]] = []
+        self._local_deletes: list[str] = []
+        # (chave, operação, bytes) para as métricas de get/set/delete
+        self._observed: list[tuple[str, str, Optional[int]]] = []
+        self.succeeded = False
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        if self._pipe is None:
+            return
+        if ttl:
+            self._pipe.setex(key, ttl, value)
+        else:
+            self._pipe.set(key, value)
+        self._observed.append((key, "set", len(value)))
+
+    def set_json(self, key: str, value: dict, ttl: Optional[int] = None) -> None:
+        try:
+            payload = self._cache.codec.encode(value)
+        except (TypeError, ValueError):
+            logger.error(
+                "json_serialization_error",
+                extra={"event_data": {"event": "json_serialization_error"}}
+            )
+            return
+        self.set(key, payload, ttl)
+        if self._cache.local is not None:
+            self._local_sets.append((key, value, len(payload), ttl))
+
+    def invalidate_local(self, *keys: str) -> None:
+        """Só o L1 (deste e dos outros workers); a chave fica no Redis."""
+        if self._cache.local is not None:
+            self._local_deletes.extend(keys)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        if self._cache.local is not None:
+            self._local_deletes.extend(keys)
+        if self._pipe is not None:
+            self._pipe.delete(*keys)
+            self._observed.extend((key, "delete", None) for key in keys)
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        if self._pipe is not None:
+            self._pipe.incrby(key, amount)
+
+    def expire(self, key: str, ttl: int) -> None:
+        if self._pipe is not None:
+            self._pipe.expire(key, ttl)
+
+    def hset_many(
+        self,
+        key: str,
+        mapping: dict[str, str],
+        ttl: Optional[int] = None
+    ) -> None:
+        if self._pipe is None or not mapping:
+            return
+        self._pipe.hset(key, mapping=mapping)
+        if ttl:
+            self._pipe.expire(key, ttl)
+
+    def hdel(self, key: str, *fields: str) -> None:
+        if self._pipe is not None and fields:
+            self._pipe.hdel(key, *fields)
+
+    def hincrby_many(self, key: str, increments: dict[str, int]) -> None:
+        if self._pipe is None:
+            return
+        for field, amount in increments.items():
+            self._pipe.hincrby(key, field, amount)
+
+    def run_script(self, script: str, keys: list[str], args: list[Any]) -> None:
+        if self._pipe is None:
+            return
+        # Como Script.__call__ com pipeline: o script é carregado (SCRIPT
+        # LOAD) no execute se o Redis ainda não o conhecer
+        runner = self._cache._get_script(script)
+        self._pipe.scripts.add(runner)
+        self._pipe.evalsha(runner.sha, len(keys), *keys, *args)
+
+    async def execute(self) -> None:
+        local = self._cache.local
+        if local is not None:
+            for key in self._local_deletes:
+                local.delete(key)
+            l1_ttl = settings.cache_l1_ttl_seconds
+            for key, value, size, ttl in self._local_sets:
+                local.set(key, value, size, min(ttl, l1_ttl) if ttl else l1_ttl)
+
+            changed = self._local_deletes + [key for key, *_ in self._local_sets]
+            if changed and self._pipe is not None:
+                self._pipe.publish(
+                    CACHE_INVALIDATION_CHANNEL,
+                    self._cache._invalidation_message({"keys": changed})
+                )
+
+        if self._pipe is None or not len(self._pipe):
+            return
+        started = time.perf_counter()
+        try:
+            await self._pipe.execute()
+            self.succeeded = True
+        except RedisError:
+            logger.error(
+                "redis_pipeline_error",
+                extra={"event_data": {"event": "redis_pipeline_error", "commands": len(self._pipe)}}
+            )
+        finally:
+            await self._pipe.reset()
+        elapsed = time.perf_counter() - started
+        for key, operation, size in self._observed:
+            cache_metrics.observe(
+                key, operation, elapsed, size=size, error=not self.succeeded
+            )
+
+def _is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and {"v", "d", "e"} <= value.keys()
+
 # singleton redis cache instance
 cache = RedisCache()
 
@@ -191,11 +981,7 @@ async def close_redis() -> None:
         extra={"event_data": {"event": "redis_disconnected"}}
     )
 
-async def store_refresh_token(user_id: str, token: str) -> bool:
-    key = f"refresh_token:{user_id}"
-    ttl = settings.refresh_token_expire_days * 86400
-    return await cache.set(key, token, ttl=ttl)
-
+# legado: um refresh token por usuário (ver core/refresh_tokens)
 async def get_refresh_token(user_id: str) -> Optional[str]:
     key = f"refresh_token:{user_id}"
     return await cache.get(key)
@@ -204,10 +990,144 @@ async def revoke_refresh_token(user_id: str) -> bool:
     key = f"refresh_token:{user_id}"
     return await cache.delete(key)
 
+# invalidação por tag
+# Cada tag tem um contador de geração "{tag}:gen" embutido nas chaves que
+# dependem dela; invalidar é incrementá-lo e as entradas da geração anterior
+# expiram pelo TTL. Se o contador expirar, recomeça do relógio do Redis em
+# ms, nunca reaproveitando uma geração que ainda possa ter entradas vivas.
+BUMP_GENERATION_SCRIPT = """
+local time = redis.call('TIME')
+local initial = time[1] .. string.format('%03d', math.floor(tonumber(time[2]) / 1000))
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCR', key)
+    else
+        redis.call('SET', key, initial)
+    end
+    redis.call('EXPIRE', key, tonumber(ARGV[1]))
+end
+return #KEYS
+"""
+
+def _bump_generation_in_memory(store: MemoryStore, keys: list[str], args: list[Any]) -> int:
+    seconds, microseconds = store.time()
+    initial = f"{seconds}{microseconds // 1000:03d}"
+    for key in keys:
+        if store.exists(key):
+            store.incr(key)
+        else:
+            store.set(key, initial)
+        store.expire(key, int(args[0]))
+    return len(keys)
+
+register_script_handler(BUMP_GENERATION_SCRIPT, _bump_generation_in_memory)
+
+def get_generation_key(tag: str) -> str:
+    return f"{tag}:gen"
+
+async def build_tagged_key(key: str, tags: list[str]) -> str:
+    """`key` seguida da geração atual de cada tag."""
+    if not tags:
+        return key
+    generations = await _get_generations([get_generation_key(tag) for tag in tags])
+    return ":".join([key, *generations])
+
+async def _get_generations(keys: list[str]) -> list[str]:
+    """
+    Com L1, as gerações também ficam no L1 e só as ausentes vão ao Redis
+    (um MGET). invalidate_tags as remove daqui e dos outros workers.
+    """
+    local = cache.local
+    generations: list[Optional[str]] = [None] * len(keys)
+    pending: list[int] = []
+    for index, key in enumerate(keys):
+        value = local.get(key) if local is not None else LocalCache.MISSING
+        if value is LocalCache.MISSING:
+            pending.append(index)
+        else:
+            generations[index] = value
+
+    if pending:
+        # Sem Redis o MGET devolve None: não guarda "0" no L1
+        available = cache._is_available()
+        values = await cache.get_many([keys[index] for index in pending])
+        for index, value in zip(pending, values):
+            generations[index] = value or "0"
+            if local is not None and available:
+                local.set(
+                    keys[index],
+                    generations[index],
+                    len(generations[index]),
+                    settings.cache_l1_ttl_seconds
+                )
+    return generations
+
+# Os helpers de escrita aceitam um CachePipeline para agrupar vários
+# comandos num round trip; nesse caso só enfileiram e retornam True.
+async def invalidate_tags(
+    tags: list[str],
+    pipeline: Optional[CachePipeline] = None
+) -> bool:
+    keys = [get_generation_key(tag) for tag in tags]
+    args = [settings.cache_generation_ttl_seconds]
+    if pipeline is not None:
+        pipeline.run_script(BUMP_GENERATION_SCRIPT, keys=keys, args=args)
+        pipeline.invalidate_local(*keys)
+        return True
+    if cache.local is not None:
+        # incremento e aviso aos workers no mesmo round trip
+        async with cache.pipeline() as pipe:
+            pipe.run_script(BUMP_GENERATION_SCRIPT, keys=keys, args=args)
+            pipe.invalidate_local(*keys)
+        return pipe.succeeded
+    result = await cache.run_script(BUMP_GENERATION_SCRIPT, keys=keys, args=args)
+    return result is not None
+
 # helpers for stats caching
-def get_stats_chache_key(user_id: str, stat_type:str) -> str:
-    return f"stats:{user_id}:{stat_type}"
+def get_user_stats_tag(user_id: str) -> str:
+    return f"stats:{user_id}"
+
+def get_user_tag(user_id: str) -> str:
+    return f"user:{user_id}"
 
-async def invalidate_user_stats(user_id: str) -> int:
-    pattern = f"stats:{user_id}:*"
-    return await cache.delete_pattern(pattern)
+async def invalidate_user_stats(
+    user_id: str,
+    pipeline: Optional[CachePipeline] = None
+) -> bool:
+    return await invalidate_tags([get_user_stats_tag(user_id)], pipeline)
+
+async def invalidate_user(
+    user_id: str,
+    pipeline: Optional[CachePipeline] = None
+) -> bool:
+    """Dados de perfil; mudanças de stats usam invalidate_user_stats."""
+    return await invalidate_tags([get_user_tag(user_id)], pipeline)
+
+# helpers for unlocked achievements (achievement_id -> unlocked_at)
+UNLOCKED_ACHIEVEMENTS_LOADED_FIELD = "_loaded"
+
+def get_unlocked_achievements_key(user_id: str) -> str:
+    return f"achievements:unlocked:{user_id}"
+
+async def add_unlocked_achievements(
+    user_id: str,
+    unlocked: dict[str, str],
+    pipeline: Optional[CachePipeline] = None
+) -> bool:
+    # Sem o campo sentinela o hash é tratado como miss e reconstruído
+    key = get_unlocked_achievements_key(user_id)
+    if pipeline is not None:
+        pipeline.hset_many(key, unlocked, ttl=settings.cache_ttl_user)
+        return True
+    return await cache.hset_many(key, unlocked, ttl=settings.cache_ttl_user)
+
+async def remove_unlocked_achievement(
+    user_id: str,
+    achievement_id: str,
+    pipeline: Optional[CachePipeline] = None
+) -> bool:
+    key = get_unlocked_achievements_key(user_id)
+    if pipeline is not None:
+        pipeline.hdel(key, achievement_id)
+        return True
+    return await cache.hdel(key, achievement_id) > 0
@@ -0,0 +1,237 @@
+import hashlib
+import hmac
+import logging
+import time
+from datetime import datetime, timezone
+from enum import IntEnum
+
+from app.core.redis_client import cache
+from app.core.security import create_refresh_token
+from app.core.memory_backend import MemoryStore, register_script_handler
+from app.core.config import settings
+
+logger = logging.getLogger("app.refresh_tokens")
+
+# Hash por usuário: device_id -> "<last_used_at>:<sha256 do token>" e
+# device_id:prev -> "<rotated_at>:<sha256 do token anterior>"
+PREVIOUS_SUFFIX = ":prev"
+
+# Registra o token do device e remove o device usado há mais tempo
+# quando o limite de devices é ultrapassado.
+REGISTER_SCRIPT = """
+local key = KEYS[1]
+redis.call('HSET', key, ARGV[1], ARGV[2])
+redis.call('HDEL', key, ARGV[1] .. ':prev')
+redis.call('EXPIRE', key, tonumber(ARGV[4]))
+
+local max_devices = tonumber(ARGV[3])
+local fields = redis.call('HGETALL', key)
+local devices = 0
+local oldest_field = nil
+local oldest_ts = nil
+for i = 1, #fields, 2 do
+    local field = fields[i]
+    if string.sub(field, -5) ~= ':prev' then
+        devices = devices + 1
+        local ts = tonumber(string.match(fields[i + 1], '^(%d+):'))
+        if oldest_ts == nil or ts < oldest_ts then
+            oldest_ts = ts
+            oldest_field = field
+        end
+    end
+end
+
+if devices > max_devices and oldest_field ~= nil then
+    redis.call('HDEL', key, oldest_field, oldest_field .. ':prev')
+    return 1
+end
+return 0
+"""
+
+# Compare-and-swap do token do device. Retorna {resultado, rotated_at}:
+#  1: rotacionado (rotated_at = agora)
+#  2: token anterior dentro da janela de tolerância (requests concorrentes);
+#     rotated_at é o da rotação, para reemitir o mesmo token
+#  0: device desconhecido/revogado
+# -1: reuso de token antigo -> todos os devices revogados
+ROTATE_SCRIPT = """
+local key = KEYS[1]
+local device = ARGV[1]
+local old_hash = ARGV[2]
+local now = tonumber(ARGV[4])
+
+local current = redis.call('HGET', key, device)
+if not current then
+    return {0, 0}
+end
+
+if string.match(current, ':(%x+)$') == old_hash then
+    redis.call('HSET', key, device, ARGV[3], device .. ':prev', now .. ':' .. old_hash)
+    redis.call('EXPIRE', key, tonumber(ARGV[6]))
+    return {1, now}
+end
+
+local previous = redis.call('HGET', key, device .. ':prev')
+if previous then
+    local rotated_at, previous_hash = string.match(previous, '^(%d+):(%x+)$')
+    if previous_hash == old_hash and now - tonumber(rotated_at) <= tonumber(ARGV[5]) then
+        return {2, tonumber(rotated_at)}
+    end
+end
+
+redis.call('DEL', key)
+return {-1, 0}
+"""
+
+
+def _register_in_memory(store: MemoryStore, keys: list[str], args: list) -> int:
+    key = keys[0]
+    device, value, max_devices, ttl = args
+    store.hset(key, device, value)
+    store.hdel(key, f"{device}{PREVIOUS_SUFFIX}")
+    store.expire(key, int(ttl))
+
+    devices = {
+        field: stored
+        for field, stored in store.hgetall(key).items()
+        if not field.endswith(PREVIOUS_SUFFIX)
+    }
+    if len(devices) > int(max_devices):
+        oldest = min(devices, key=lambda field: int(devices[field].split(":", 1)[0]))
+        store.hdel(key, oldest, f"{oldest}{PREVIOUS_SUFFIX}")
+        return 1
+    return 0
+
+
+def _rotate_in_memory(store: MemoryStore, keys: list[str], args: list) -> list[int]:
+    key = keys[0]
+    device, old_hash, new_value, now, grace, ttl = args
+    current = store.hget(key, device)
+    if current is None:
+        return [0, 0]
+
+    if current.rsplit(":", 1)[-1] == old_hash:
+        store.hset(key, mapping={
+            device: new_value,
+            f"{device}{PREVIOUS_SUFFIX}": f"{now}:{old_hash}"
+        })
+        store.expire(key, int(ttl))
+        return [1, int(now)]
+
+    previous = store.hget(key, f"{device}{PREVIOUS_SUFFIX}")
+    if previous is not None:
+        rotated_at, _, previous_hash = previous.partition(":")
+        if previous_hash == old_hash and int(now) - int(rotated_at) <= int(grace):
+            return [2, int(rotated_at)]
+
+    store.delete(key)
+    return [-1, 0]
+
+
+register_script_handler(REGISTER_SCRIPT, _register_in_memory)
+register_script_handler(ROTATE_SCRIPT, _rotate_in_memory)
+
+
+class RotationResult(IntEnum):
+    REUSED = -1
+    INVALID = 0
+    ROTATED = 1
+    GRACE = 2
+
+
+def get_refresh_registry_key(user_id: str) -> str:
+    return f"refresh_tokens:{user_id}"
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _ttl() -> int:
+    return settings.refresh_token_expire_days * 86400
+
+
+async def register_refresh_token(user_id: str, device_id: str, token: str) -> bool:
+    evicted = await cache.run_script(
+        REGISTER_SCRIPT,
+        keys=[get_refresh_registry_key(user_id)],
+        args=[
+            device_id,
+            f"{int(time.time())}:{hash_refresh_token(token)}",
+            settings.refresh_max_devices,
+            _ttl()
+        ]
+    )
+    if evicted:
+        logger.info(
+            "refresh_device_evicted",
+            extra={"event_data": {"event": "refresh_device_evicted", "user_id": user_id}}
+        )
+    return evicted is not None
+
+
+def _rotated_token(user_id: str, device_id: str, old_token: str, issued_at: int) -> str:
+    """
+    Sucessor determinístico de `old_token`: o jti vem de um HMAC do token
+    anterior, então a mesma rotação sempre gera o mesmo token.
+    """
+    token_id = hmac.new(
+        settings.secret_key.encode("utf-8"),
+        old_token.encode("utf-8"),
+        hashlib.sha256
+    ).hexdigest()[:32]
+    return create_refresh_token(
+        user_id,
+        device_id,
+        token_id=token_id,
+        issued_at=datetime.fromtimestamp(issued_at, timezone.utc)
+    )
+
+
+async def rotate_refresh_token(
+    user_id: str,
+    device_id: str,
+    old_token: str
+) -> tuple[RotationResult, str | None]:
+    """
+    Retorna o resultado e o token que passa a valer no device. Dentro da
+    janela de tolerância é o mesmo já emitido na rotação, para que o
+    cliente que perdeu a resposta concorrente não fique com o anterior.
+    """
+    now = int(time.time())
+    new_token = _rotated_token(user_id, device_id, old_token, now)
+    result = await cache.run_script(
+        ROTATE_SCRIPT,
+        keys=[get_refresh_registry_key(user_id)],
+        args=[
+            device_id,
+            hash_refresh_token(old_token),
+            f"{now}:{hash_refresh_token(new_token)}",
+            now,
+            settings.refresh_reuse_grace_seconds,
+            _ttl()
+        ]
+    )
+    # Sem Redis não há como validar o token
+    if result is None:
+        return RotationResult.INVALID, None
+
+    outcome, rotated_at = RotationResult(int(result[0])), int(result[1])
+    if outcome == RotationResult.ROTATED:
+        return outcome, new_token
+    if outcome == RotationResult.GRACE:
+        return outcome, _rotated_token(user_id, device_id, old_token, rotated_at)
+    return outcome, None
+
+
+async def revoke_device(user_id: str, device_id: str) -> bool:
+    removed = await cache.hdel(
+        get_refresh_registry_key(user_id),
+        device_id,
+        f"{device_id}{PREVIOUS_SUFFIX}"
+    )
+    return removed > 0
+
+
+async def revoke_all_devices(user_id: str) -> bool:
+    return await cache.delete(get_refresh_registry_key(user_id))
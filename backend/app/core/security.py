@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
 from jose import jwt, JWTError
 from app.core.config import settings
+import asyncio
 import bcrypt
 import hashlib
 import base64
+import time
+import uuid
+
+T = TypeVar("T")
 
 
 def _prepare_password(password: str) -> bytes:
@@ -24,10 +31,111 @@ def get_password_hash(password: str) -> str:
     ).decode("utf-8")
 
 
+class PasswordHashingUnavailable(Exception):
+    """Pool de hashing saturado; o request deve ser recusado (503)."""
+
+
+class PasswordHasher:
+    """
+    Executa bcrypt num pool de threads dedicado, fora do event loop.
+
+    O bcrypt libera o GIL durante o hash, então threads bastam. Acima de
+    `password_hash_workers + password_hash_max_queue` operações pendentes
+    novas chamadas falham imediatamente com PasswordHashingUnavailable.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self._workers = workers
+        self._max_pending = workers + max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait_ms = 0.0
+        self._total_run_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise PasswordHashingUnavailable(
+                    "Serviço de autenticação sobrecarregado"
+                )
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        submitted_at = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        def timed_call() -> T:
+            started_at = time.perf_counter()
+            timings["wait_ms"] = (started_at - submitted_at) * 1000
+            try:
+                return func(*args)
+            finally:
+                timings["run_ms"] = (time.perf_counter() - started_at) * 1000
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), timed_call)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_wait_ms += timings.get("wait_ms", 0.0)
+                self._total_run_ms += timings.get("run_ms", 0.0)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self._workers,
+                "max_pending": self._max_pending,
+                "pending": self._pending,
+                "queued": max(self._pending - self._workers, 0),
+                "peak_pending": self._peak_pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait_ms / completed, 2) if completed else 0.0,
+                "avg_run_ms": round(self._total_run_ms / completed, 2) if completed else 0.0,
+            }
+
+
+# singleton por worker
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
+
 # jwt tokens
 def create_access_token(
         subject: str | dict,
-        expires_delta: Optional[timedelta] = None
+        expires_delta: Optional[timedelta] = None,
+        token_version: int = 0,
+        is_admin: bool = False,
+        device_id: Optional[str] = None
 ) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -39,8 +147,13 @@ def create_access_token(
     to_encode = {
         "exp": expire,
         "sub": str(subject),
-        "type": "access"
+        "type": "access",
+        "ver": token_version,
+        "adm": is_admin,
+        "jti": uuid.uuid4().hex
     }
+    if device_id:
+        to_encode["did"] = device_id
 
     encoded_jwt = jwt.encode(
         to_encode,
@@ -50,16 +163,29 @@ def create_access_token(
 
     return encoded_jwt
 
-def create_refresh_token(subject: str | dict) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(
+def new_device_id() -> str:
+    return uuid.uuid4().hex
+
+def create_refresh_token(
+        subject: str | dict,
+        device_id: Optional[str] = None,
+        token_id: Optional[str] = None,
+        issued_at: Optional[datetime] = None
+) -> str:
+    # Com token_id e issued_at fixos o token é reproduzível (rotação)
+    expire = (issued_at or datetime.now(timezone.utc)) + timedelta(
         days=settings.refresh_token_expire_days
     )
 
     to_encode = {
         "exp": expire,
         "sub": str(subject),
-        "type": "refresh"
+        "type": "refresh",
+        # jti torna cada token único, mesmo emitidos no mesmo segundo
+        "jti": token_id or uuid.uuid4().hex
     }
+    if device_id:
+        to_encode["did"] = device_id
 
     encoded_jwt = jwt.encode(
         to_encode,
@@ -85,12 +211,21 @@ def verify_token_type(payload: dict, expected_type: str) -> bool:
     return payload.get("type") == expected_type
 
 # utils
-def create_token_pair(user_id: str) -> dict[str, str]:
+def create_token_pair(
+    user_id: str,
+    token_version: int = 0,
+    is_admin: bool = False,
+    device_id: Optional[str] = None
+) -> dict[str, str]:
     return {
         "access_token": create_access_token(
-            subject=user_id
+            subject=user_id,
+            token_version=token_version,
+            is_admin=is_admin,
+            device_id=device_id
         ),
         "refresh_token": create_refresh_token(
-            subject=user_id
+            subject=user_id,
+            device_id=device_id
         )
     }
\ No newline at end of file
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("app.tasks")
+
+_periodic_tasks: dict[str, asyncio.Task] = {}
+
+
+def start_periodic_task(
+    name: str,
+    interval_seconds: float,
+    func: Callable[[], Awaitable[None]],
+    *,
+    run_immediately: bool = True
+) -> None:
+    """
+    Executa `func` a cada `interval_seconds` enquanto o worker estiver de pé.
+    Erros são logados e não interrompem as próximas execuções.
+    """
+    if name in _periodic_tasks and not _periodic_tasks[name].done():
+        return
+
+    async def runner() -> None:
+        if not run_immediately:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "periodic_task_failed",
+                    extra={"event_data": {
+                        "event": "periodic_task_failed",
+                        "task": name,
+                        "error": str(e)
+                    }}
+                )
+            await asyncio.sleep(interval_seconds)
+
+    _periodic_tasks[name] = asyncio.create_task(runner(), name=f"periodic:{name}")
+
+
+async def stop_periodic_tasks() -> None:
+    tasks = list(_periodic_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _periodic_tasks.clear()
@@ -0,0 +1,118 @@
+import logging
+import time
+from typing import Any
+
+from app.core.pubsub import pubsub_hub
+from app.core.redis_client import cache
+from app.core.config import settings
+
+logger = logging.getLogger("app.token_denylist")
+
+TOKEN_DENYLIST_CHANNEL = "auth:denylist"
+
+
+def get_denylist_bucket_key(bucket: int) -> str:
+    return f"auth:denylist:{bucket}"
+
+
+def get_device_entry(device_id: str) -> str:
+    return f"did:{device_id}"
+
+
+class TokenDenylist:
+    """
+    Access tokens revogados antes do `exp`, identificados pelo `jti` ou,
+    para todos os tokens de um device, por `did:<device_id>`.
+
+    No Redis os jtis ficam em sets agrupados pela janela de expiração
+    (`token_denylist_bucket_seconds`), e cada set expira junto com o
+    último token que pode conter. Cada worker mantém uma cópia local,
+    atualizada pelo pub/sub e recarregada periodicamente, então a checagem
+    por request é só um lookup em dict.
+    """
+
+    def __init__(self) -> None:
+        # jti -> instante (epoch) a partir do qual pode ser descartado
+        self._revoked: dict[str, int] = {}
+
+    @staticmethod
+    def _bucket_end(bucket: int) -> int:
+        return (bucket + 1) * settings.token_denylist_bucket_seconds
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def is_device_revoked(self, device_id: str | None) -> bool:
+        return device_id is not None and get_device_entry(device_id) in self._revoked
+
+    async def revoke_device(self, device_id: str) -> None:
+        """
+        Todos os access tokens já emitidos para o device, inclusive os de
+        refreshes anteriores ainda não expirados. Nenhum dura mais que
+        `access_token_expire_minutes`, e o device não recebe novos.
+        """
+        await self.revoke(
+            get_device_entry(device_id),
+            int(time.time()) + settings.access_token_expire_minutes * 60
+        )
+
+    async def revoke(self, jti: str, expires_at: int) -> None:
+        if expires_at <= time.time():
+            return
+
+        bucket = expires_at // settings.token_denylist_bucket_seconds
+        discard_at = self._bucket_end(bucket)
+        self._revoked[jti] = discard_at
+
+        await cache.sadd_many(
+            get_denylist_bucket_key(bucket),
+            [jti],
+            expire_at=discard_at
+        )
+        await pubsub_hub.publish(
+            TOKEN_DENYLIST_CHANNEL,
+            {"jti": jti, "discard_at": discard_at}
+        )
+
+    async def refresh(self) -> None:
+        """Recarrega os buckets ainda vivos do Redis e poda os expirados."""
+        now = int(time.time())
+        first = now // settings.token_denylist_bucket_seconds
+        last = (
+            now + settings.access_token_expire_minutes * 60
+        ) // settings.token_denylist_bucket_seconds
+
+        loaded: dict[str, int] = {}
+        for bucket in range(first, last + 1):
+            members = await cache.smembers(get_denylist_bucket_key(bucket))
+            if members is None:
+                # Sem Redis: mantém a cópia local, só remove expirados
+                self._prune(now)
+                return
+            discard_at = self._bucket_end(bucket)
+            for jti in members:
+                loaded[jti] = discard_at
+
+        # Revogações locais ainda não vistas no Redis não se perdem
+        for jti, discard_at in self._revoked.items():
+            if discard_at > now:
+                loaded.setdefault(jti, discard_at)
+        self._revoked = loaded
+
+    def _prune(self, now: int) -> None:
+        self._revoked = {
+            jti: discard_at
+            for jti, discard_at in self._revoked.items()
+            if discard_at > now
+        }
+
+    def _on_message(self, payload: dict[str, Any]) -> None:
+        jti = payload.get("jti")
+        discard_at = payload.get("discard_at")
+        if jti and discard_at:
+            self._revoked[jti] = int(discard_at)
+
+
+# singleton por worker
+token_denylist = TokenDenylist()
+pubsub_hub.register(TOKEN_DENYLIST_CHANNEL, token_denylist._on_message)
@@ -0,0 +1,132 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from app.core.pubsub import pubsub_hub
+from app.core.redis_client import cache, get_generation_key, invalidate_tags
+from app.core.config import settings
+
+logger = logging.getLogger("app.user_status")
+
+USER_STATUS_CHANNEL = "auth:user_status"
+
+StatusLoader = Callable[[UUID], Awaitable[dict[str, Any] | None]]
+
+
+def get_user_status_tag(user_id: str) -> str:
+    return f"auth:user_status:{user_id}"
+
+
+def get_user_status_key(user_id: str, generation: str) -> str:
+    return f"{get_user_status_tag(user_id)}:{generation}"
+
+
+@dataclass(frozen=True)
+class UserStatus:
+    """Mínimo necessário para autorizar um request sem ir ao banco."""
+    is_active: bool
+    is_deleted: bool
+    is_admin: bool
+    token_version: int
+
+    @property
+    def can_authenticate(self) -> bool:
+        return self.is_active and not self.is_deleted
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, Any] | None) -> "UserStatus":
+        # Usuário inexistente fica cacheado como removido
+        if columns is None:
+            return cls(is_active=False, is_deleted=True, is_admin=False, token_version=0)
+        return cls(
+            is_active=bool(columns["is_active"]),
+            is_deleted=columns["deleted_at"] is not None,
+            is_admin=bool(columns["is_admin"]),
+            token_version=int(columns["token_version"] or 0)
+        )
+
+
+class UserStatusCache:
+    """
+    Cache em dois níveis do status de autenticação dos usuários.
+
+    L1 é um dict por worker com TTL curto (`user_status_local_ttl_seconds`);
+    L2 é o Redis (`cache_ttl_user_status`). Alterações de status chamam
+    `invalidate()`, que incrementa a geração do usuário e avisa todos os
+    workers via pub/sub. Sem Redis, outros workers enxergam a mudança
+    quando o L1 expira.
+
+    Um loader que leu o banco antes da invalidação grava na geração (ou
+    época do L1) anterior, que ninguém mais lê: o status antigo não volta.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._local: OrderedDict[str, tuple[UserStatus, float]] = OrderedDict()
+        # incrementada a cada invalidação recebida por este worker
+        self._epoch = 0
+
+    async def get(self, user_id: UUID, loader: StatusLoader) -> UserStatus:
+        key = str(user_id)
+        now = time.monotonic()
+
+        entry = self._local.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        # Lidos antes do banco: uma invalidação concorrente muda ambos
+        epoch = self._epoch
+        generation = await cache.get(get_generation_key(get_user_status_tag(key))) or "0"
+        status_key = get_user_status_key(key, generation)
+
+        status = None
+        raw = await cache.get(status_key)
+        if raw:
+            try:
+                status = UserStatus(**json.loads(raw))
+            except (TypeError, ValueError):
+                status = None
+
+        if status is None:
+            status = UserStatus.from_columns(await loader(user_id))
+            await cache.set(
+                status_key,
+                json.dumps(asdict(status)),
+                ttl=settings.cache_ttl_user_status
+            )
+
+        if epoch == self._epoch:
+            self._store_local(key, status, now)
+        return status
+
+    async def invalidate(self, user_id: UUID) -> None:
+        key = str(user_id)
+        self._forget_local(key)
+        await invalidate_tags([get_user_status_tag(key)])
+        await pubsub_hub.publish(USER_STATUS_CHANNEL, {"user_id": key})
+
+    def _forget_local(self, key: str) -> None:
+        self._epoch += 1
+        self._local.pop(key, None)
+
+    def _store_local(self, key: str, status: UserStatus, now: float) -> None:
+        self._local[key] = (status, now + settings.user_status_local_ttl_seconds)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_entries:
+            self._local.popitem(last=False)
+
+    def _on_invalidation(self, payload: dict[str, Any]) -> None:
+        user_id = payload.get("user_id")
+        if user_id:
+            self._forget_local(user_id)
+
+
+# singleton por worker
+user_status_cache = UserStatusCache(
+    max_entries=settings.user_status_local_max_entries
+)
+pubsub_hub.register(USER_STATUS_CHANNEL, user_status_cache._on_invalidation)
@@ -9,8 +9,15 @@ from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.database import init_db, close_db
 from app.core.redis_client import init_redis, close_redis
+from app.core.pubsub import init_pubsub, close_pubsub
+from app.core.tasks import start_periodic_task, stop_periodic_tasks
 from app.core.logging import configure_logging
 from app.core.metrics import security_metrics
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.security import password_hasher
+from app.services.achievement_backfill import cancel_achievement_backfills
+from app.services.achievement_rarity import reconcile_achievement_holders
+from app.core.token_denylist import token_denylist
 from app.api.v1.router import api_router
 
 configure_logging(settings.log_level)
@@ -43,6 +50,21 @@ async def lifespan(app: FastAPI):
         "redis_connected",
         extra={"event_data": {"event": "redis_connected"}}
     )
+
+    # Assinatura pub/sub compartilhada (eventos SSE)
+    await init_pubsub()
+
+    # Jobs periódicos
+    start_periodic_task(
+        "achievement_holders_reconcile",
+        settings.achievement_rarity_reconcile_seconds,
+        reconcile_achievement_holders
+    )
+    start_periodic_task(
+        "token_denylist_refresh",
+        settings.token_denylist_refresh_seconds,
+        token_denylist.refresh
+    )
     
     logger.info(
         "startup_complete",
@@ -60,8 +82,12 @@ async def lifespan(app: FastAPI):
         "shutdown_begin",
         extra={"event_data": {"event": "app_shutdown_begin"}}
     )
+    await stop_periodic_tasks()
+    await cancel_achievement_backfills()
+    await close_pubsub()
     await close_redis()
     await close_db()
+    password_hasher.shutdown()
     logger.info(
         "shutdown_complete",
         extra={"event_data": {"event": "app_shutdown_complete"}}
@@ -100,6 +126,10 @@ app = FastAPI(
 )
 
 
+# rate limiting (antes do CORS: os 429 também recebem headers de CORS)
+app.add_middleware(RateLimitMiddleware)
+
+
 # cors
 settings.validate_cors_credentials_policy()
 app.add_middleware(
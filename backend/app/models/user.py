@@ -48,6 +48,13 @@ class User(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
         nullable=False,
     )
 
+    token_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Incrementado para revogar todos os access tokens do usuário"
+    )
+
     full_name: Mapped[str | None] = mapped_column(
         String(255),
         nullable=True
@@ -23,6 +23,15 @@ class AchievementRepository(BaseRepository[Achievement]):
         return await self.exists_by_field("name", name)
 
 
+    # catalogo completo (ativas e inativas)
+    async def list_catalog(self) -> Sequence[Achievement]:
+        result = await self.db.execute(
+            select(Achievement)
+            .order_by(Achievement.display_order, Achievement.name)
+        )
+        return result.scalars().all()
+
+
     # achievements ativos
     async def list_active_achievements(
         self,
@@ -151,7 +151,7 @@ class BaseRepository(Generic[ModelType]):
         return result.rowcount > 0
     
     async def delete_instance(self, instance: ModelType) -> None:
-        self.db.delete(instance)
+        await self.db.delete(instance)
         await self.db.commit()
 
     async def soft_delete_by_id(self, id: UUID) -> bool:
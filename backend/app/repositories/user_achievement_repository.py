@@ -1,12 +1,14 @@
 from typing import Sequence
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, and_, func, desc, literal, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.models.user_achievement import UserAchievement
 from app.models.achievement import Achievement
+from app.models.user import User
 from app.repositories.base_repository import BaseRepository
 
 
@@ -29,6 +31,105 @@ class UserAchievementRepository(BaseRepository[UserAchievement]):
             unlocked_at=datetime.now(timezone.utc)
         )
 
+    async def unlock_achievements_bulk(
+        self,
+        user_id: UUID,
+        progress_by_achievement: dict[UUID, int]
+    ) -> dict[UUID, datetime]:
+        """
+        Desbloqueia várias conquistas em um único INSERT.
+
+        Retorna achievement_id -> unlocked_at apenas das linhas inseridas;
+        as que já existiam são ignoradas pelo ON CONFLICT.
+        """
+        if not progress_by_achievement:
+            return {}
+
+        now = datetime.now(timezone.utc)
+        result = await self.db.execute(
+            pg_insert(UserAchievement)
+            .values([
+                {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "achievement_id": achievement_id,
+                    "progress_value": progress_value,
+                    "unlocked_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for achievement_id, progress_value
+                in progress_by_achievement.items()
+            ])
+            .on_conflict_do_nothing(constraint="uq_user_achievement")
+            .returning(
+                UserAchievement.achievement_id,
+                UserAchievement.unlocked_at
+            )
+        )
+        inserted = {row.achievement_id: row.unlocked_at for row in result.all()}
+        await self.db.commit()
+
+        return inserted
+
+    async def backfill_achievement(
+        self,
+        achievement_id: UUID,
+        criteria_type: str,
+        criteria_value: int,
+        first_user_id: UUID,
+        last_user_id: UUID
+    ) -> dict[UUID, datetime]:
+        """
+        Desbloqueia a conquista para todos os usuários ativos do intervalo
+        [first_user_id, last_user_id] que já atendem ao critério, com um
+        único INSERT ... SELECT sobre users.
+
+        Retorna user_id -> unlocked_at de quem recebeu a conquista agora.
+        """
+        stat_column = getattr(User, criteria_type)
+        now = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+
+        eligible = select(
+            func.gen_random_uuid(),
+            User.id,
+            literal(achievement_id, PG_UUID(as_uuid=True)),
+            stat_column,
+            now,
+            now,
+            now
+        ).where(
+            and_(
+                User.id >= first_user_id,
+                User.id <= last_user_id,
+                User.is_active.is_(True),
+                User.deleted_at.is_(None),
+                stat_column >= criteria_value
+            )
+        )
+
+        result = await self.db.execute(
+            pg_insert(UserAchievement)
+            .from_select(
+                [
+                    "id",
+                    "user_id",
+                    "achievement_id",
+                    "progress_value",
+                    "unlocked_at",
+                    "created_at",
+                    "updated_at",
+                ],
+                eligible
+            )
+            .on_conflict_do_nothing(constraint="uq_user_achievement")
+            .returning(UserAchievement.user_id, UserAchievement.unlocked_at)
+        )
+        unlocked = {row.user_id: row.unlocked_at for row in result.all()}
+        await self.db.commit()
+
+        return unlocked
+
     async def has_achievement(
         self,
         user_id: UUID,
@@ -76,6 +177,18 @@ class UserAchievementRepository(BaseRepository[UserAchievement]):
         )
         return set(result.scalars().all())
 
+    async def get_unlocked_at_by_achievement(
+        self,
+        user_id: UUID
+    ) -> dict[UUID, datetime]:
+        result = await self.db.execute(
+            select(
+                UserAchievement.achievement_id,
+                UserAchievement.unlocked_at
+            ).where(UserAchievement.user_id == user_id)
+        )
+        return {row.achievement_id: row.unlocked_at for row in result.all()}
+
     async def get_recent_unlocks(
         self,
         user_id: UUID,
@@ -110,6 +223,24 @@ class UserAchievementRepository(BaseRepository[UserAchievement]):
         )
         return result.scalar_one() or 0
 
+    async def count_holders_by_achievement(self) -> dict[UUID, int]:
+        """Quantos usuários ativos possuem cada conquista."""
+        result = await self.db.execute(
+            select(
+                UserAchievement.achievement_id,
+                func.count(UserAchievement.id).label("holders")
+            )
+            .join(User, UserAchievement.user_id == User.id)
+            .where(
+                and_(
+                    User.is_active.is_(True),
+                    User.deleted_at.is_(None)
+                )
+            )
+            .group_by(UserAchievement.achievement_id)
+        )
+        return {row.achievement_id: row.holders for row in result.all()}
+
     async def get_achievements_by_category_count(
         self,
         user_id: UUID
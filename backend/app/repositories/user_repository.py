@@ -1,7 +1,7 @@
-from typing import Sequence
+from typing import Any, Sequence
 from uuid import UUID
 from datetime import datetime, timezone
-from sqlalchemy import select, and_, or_, desc, update
+from sqlalchemy import select, and_, or_, desc, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
@@ -54,6 +54,26 @@ class UserRepository(BaseRepository[User]):
         )
         return result.scalar_one_or_none()
 
+    async def get_columns_by_id(
+        self,
+        user_id: UUID,
+        fields: Sequence[str]
+    ) -> dict[str, Any] | None:
+        """Busca apenas as colunas pedidas (sem carregar relacionamentos)."""
+        result = await self.db.execute(
+            select(*(getattr(User, field) for field in fields))
+            .where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return dict(row._mapping) if row else None
+
+    async def get_auth_status(self, user_id: UUID) -> dict[str, Any] | None:
+        """Colunas usadas na autorização de requests (ver core/user_status)."""
+        return await self.get_columns_by_id(
+            user_id,
+            ("is_active", "deleted_at", "is_admin", "token_version")
+        )
+
     async def exists_by_email(self, email: str) -> bool:
         return await self.exists_by_field("email", email.lower())
 
@@ -94,6 +114,41 @@ class UserRepository(BaseRepository[User]):
         return result.scalars().all()
 
 
+    async def count_active_users(self) -> int:
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(User)
+            .where(
+                and_(
+                    User.is_active.is_(True),
+                    User.deleted_at.is_(None)
+                )
+            )
+        )
+        return result.scalar_one()
+
+    async def list_active_ids_after(
+        self,
+        after_id: UUID | None,
+        limit: int = 1000
+    ) -> list[UUID]:
+        """Paginação por keyset em users.id (para jobs em lote)."""
+        conditions = [
+            User.is_active.is_(True),
+            User.deleted_at.is_(None)
+        ]
+        if after_id is not None:
+            conditions.append(User.id > after_id)
+
+        result = await self.db.execute(
+            select(User.id)
+            .where(and_(*conditions))
+            .order_by(User.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+
     # statistics \ leaderboard
     async def get_top_users_by_retention(
         self,
@@ -187,6 +242,29 @@ class UserRepository(BaseRepository[User]):
         await self.db.commit()
         return result.rowcount > 0
 
+    async def increment_token_version(self, user_id: UUID) -> int | None:
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+        )
+        await self.db.commit()
+        return result.scalar_one_or_none()
+
+    async def set_admin(self, user_id: UUID, is_admin: bool) -> bool:
+        # Nova versão força a reemissão dos tokens com a claim `adm` atualizada
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                is_admin=is_admin,
+                token_version=User.token_version + 1
+            )
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
     async def verify_email(self, user_id: UUID) -> bool:
         result = await self.db.execute(
             update(User)
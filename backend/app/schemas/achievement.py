@@ -82,6 +82,10 @@ class AchievementUpdate(BaseSchema):
         ge=1,
         le=1000
     )
+    criteria_value: int | None = Field(
+        None,
+        ge=1
+    )
     is_active: bool | None = None
     is_hidden: bool | None = None
     display_order: int | None = Field(
@@ -146,6 +150,20 @@ class AchievementResponse(UUIDSchema, TimestampSchema):
         }
         return colors.get(self.rarity, "#9CA3AF")
 
+# catalog (público)
+class AchievementCatalogItem(AchievementResponse):
+    holders_count: int = Field(
+        0,
+        ge=0,
+        description="Usuários que desbloquearam a conquista"
+    )
+    holders_percentage: float = Field(
+        0.0,
+        ge=0,
+        le=100,
+        description="Porcentagem de usuários ativos que desbloquearam"
+    )
+
 # progress
 class AchievementProgress(BaseSchema):
     current: int = Field(
@@ -276,3 +294,38 @@ class CheckAchievementsResponse(BaseSchema):
         ...,
         description="Mensagem amigável de resultado"
     )
+
+
+# backfill (admin)
+class AchievementBackfillStatus(BaseSchema):
+    achievement_id: UUID = Field(
+        ...,
+        description="ID da conquista"
+    )
+    status: str = Field(
+        ...,
+        description="running, completed, skipped, cancelled ou failed"
+    )
+    total_users: int = Field(
+        ...,
+        ge=0,
+        description="Usuários ativos no início do job"
+    )
+    processed_users: int = Field(
+        ...,
+        ge=0,
+        description="Usuários avaliados até agora"
+    )
+    unlocked_users: int = Field(
+        ...,
+        ge=0,
+        description="Usuários que receberam a conquista"
+    )
+    started_at: datetime = Field(
+        ...,
+        description="Início do job"
+    )
+    finished_at: datetime | None = Field(
+        None,
+        description="Fim do job (se concluído)"
+    )
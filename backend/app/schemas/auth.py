@@ -94,6 +94,13 @@ class AccessTokenResponse(BaseSchema):
         ...,
         description="Novo token de acesso (JWT)"
     )
+    refresh_token: str | None = Field(
+        None,
+        description=(
+            "Refresh token rotacionado; o anterior deixa de valer. "
+            "Ausente no fluxo cookie HttpOnly."
+        )
+    )
     token_type: str = Field(
         "bearer",
         description="Tipo do token"
@@ -129,3 +136,11 @@ class TokenPayload(BaseSchema):
         ...,
         description="Tipo do token (access ou refresh)"
     )
+    ver: int = Field(
+        0,
+        description="token_version do usuário na emissão (access)"
+    )
+    adm: bool = Field(
+        False,
+        description="Usuário era administrador na emissão (access)"
+    )
@@ -42,6 +42,14 @@ class UserUpdate(BaseSchema):
         return v
 
 
+# admin
+class UserAdminUpdate(BaseSchema):
+    is_admin: bool = Field(
+        ...,
+        description="Concede ou remove o papel de administrador"
+    )
+
+
 # reponse
 class UserResponse(UUIDSchema, TimestampSchema, UserBase):
     avatar_url: str | None = Field(
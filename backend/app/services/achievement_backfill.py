@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.repositories.achievement_repository import AchievementRepository
+from app.repositories.user_achievement_repository import UserAchievementRepository
+from app.repositories.user_repository import UserRepository
+from app.services.achievement_rules import ACHIEVEMENT_STAT_FIELDS
+from app.services.achievement_rarity import record_achievement_unlocks
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import (
+    cache,
+    add_unlocked_achievements
+)
+from app.core.config import settings
+
+logger = logging.getLogger("app.achievement_backfill")
+
+BACKFILL_STATUS_TTL = 86400
+
+# jobs em execução neste worker (achievement_id -> task)
+_running: dict[UUID, asyncio.Task] = {}
+# alterações recebidas durante um job em andamento
+_pending_rerun: set[UUID] = set()
+
+
+def get_backfill_status_key(achievement_id: UUID) -> str:
+    return f"achievements:backfill:{achievement_id}"
+
+
+async def get_backfill_status(achievement_id: UUID) -> dict | None:
+    return await cache.get_json(get_backfill_status_key(achievement_id))
+
+
+def schedule_achievement_backfill(achievement_id: UUID) -> None:
+    """
+    Agenda o backfill da conquista em background.
+
+    Se já existe um job para a mesma conquista, ele é reexecutado ao
+    terminar para considerar o critério mais recente.
+    """
+    task = _running.get(achievement_id)
+    if task is not None and not task.done():
+        _pending_rerun.add(achievement_id)
+        return
+
+    _running[achievement_id] = asyncio.create_task(
+        _backfill_worker(achievement_id),
+        name=f"achievement_backfill:{achievement_id}"
+    )
+
+
+async def cancel_achievement_backfills() -> None:
+    tasks = [task for task in _running.values() if not task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _running.clear()
+    _pending_rerun.clear()
+
+
+async def _backfill_worker(achievement_id: UUID) -> None:
+    try:
+        while True:
+            _pending_rerun.discard(achievement_id)
+            await run_achievement_backfill(achievement_id)
+            if achievement_id not in _pending_rerun:
+                break
+    finally:
+        _running.pop(achievement_id, None)
+
+
+async def _report(progress: dict) -> None:
+    await cache.set_json(
+        get_backfill_status_key(progress["achievement_id"]),
+        progress,
+        ttl=BACKFILL_STATUS_TTL
+    )
+
+
+async def run_achievement_backfill(achievement_id: UUID) -> dict:
+    """
+    Avalia uma conquista contra todos os usuários ativos, em lotes por
+    keyset sobre users.id, invalidando o cache apenas de quem a recebeu.
+    """
+    progress = {
+        "achievement_id": str(achievement_id),
+        "status": "running",
+        "total_users": 0,
+        "processed_users": 0,
+        "unlocked_users": 0,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+    }
+
+    try:
+        async with AsyncSessionLocal() as db:
+            achievement_repo = AchievementRepository(db)
+            user_repo = UserRepository(db)
+            user_achievement_repo = UserAchievementRepository(db)
+
+            achievement = await achievement_repo.get_active_by_id(achievement_id)
+            # Ocultas não são desbloqueadas automaticamente
+            if (
+                not achievement
+                or achievement.is_hidden
+                or achievement.criteria_type not in ACHIEVEMENT_STAT_FIELDS
+            ):
+                progress["status"] = "skipped"
+                progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+                await _report(progress)
+                return progress
+
+            progress["total_users"] = await user_repo.count_active_users()
+            await _report(progress)
+
+            cursor: UUID | None = None
+            while True:
+                user_ids = await user_repo.list_active_ids_after(
+                    cursor,
+                    limit=settings.achievement_backfill_batch_size
+                )
+                if not user_ids:
+                    break
+
+                unlocked = await user_achievement_repo.backfill_achievement(
+                    achievement_id=achievement.id,
+                    criteria_type=achievement.criteria_type,
+                    criteria_value=achievement.criteria_value,
+                    first_user_id=user_ids[0],
+                    last_user_id=user_ids[-1]
+                )
+
+                # Um round trip por lote, não dois por usuário
+                async with cache.pipeline() as pipe:
+                    for user_id, unlocked_at in unlocked.items():
+                        await add_unlocked_achievements(
+                            str(user_id),
+                            {str(achievement_id): unlocked_at.isoformat()},
+                            pipeline=pipe
+                        )
+                    await record_achievement_unlocks(
+                        {achievement_id: len(unlocked)},
+                        pipeline=pipe
+                    )
+
+                cursor = user_ids[-1]
+                progress["processed_users"] += len(user_ids)
+                progress["unlocked_users"] += len(unlocked)
+                await _report(progress)
+
+                logger.info(
+                    "achievement_backfill_progress",
+                    extra={"event_data": {
+                        "event": "achievement_backfill_progress",
+                        "achievement_id": str(achievement_id),
+                        "processed_users": progress["processed_users"],
+                        "total_users": progress["total_users"],
+                        "unlocked_users": progress["unlocked_users"]
+                    }}
+                )
+
+        progress["status"] = "completed"
+        progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+        await _report(progress)
+
+        logger.info(
+            "achievement_backfill_completed",
+            extra={"event_data": {
+                "event": "achievement_backfill_completed",
+                "achievement_id": str(achievement_id),
+                "processed_users": progress["processed_users"],
+                "unlocked_users": progress["unlocked_users"]
+            }}
+        )
+
+    except asyncio.CancelledError:
+        progress["status"] = "cancelled"
+        progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+        await _report(progress)
+        raise
+
+    except Exception as e:
+        progress["status"] = "failed"
+        progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+        await _report(progress)
+        logger.error(
+            "achievement_backfill_failed",
+            extra={"event_data": {
+                "event": "achievement_backfill_failed",
+                "achievement_id": str(achievement_id),
+                "error": str(e)
+            }}
+        )
+
+    return progress
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Sequence
+from uuid import UUID
+
+from app.repositories.achievement_repository import AchievementRepository
+from app.repositories.user_achievement_repository import UserAchievementRepository
+from app.repositories.user_repository import UserRepository
+from app.services.achievement_rules import AchievementRuleIndex
+from app.services.achievement_rarity import RarityStats, load_rarity_stats
+from app.schemas.achievement import AchievementResponse
+from app.models.achievement import (
+    Achievement,
+    AchievementCategory,
+    AchievementRarity
+)
+from app.core.redis_client import cache
+from app.core.config import settings
+
+logger = logging.getLogger("app.achievement_catalog")
+
+CATALOG_VERSION_KEY = "achievements:catalog:version"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Snapshot imutável do catálogo de conquistas de um worker.
+
+    Guarda todas as conquistas (ativas e inativas) para que conquistas
+    desativadas continuem resolvíveis para quem já as desbloqueou.
+    """
+    version: str | None
+    fingerprint: str
+    loaded_at: float
+    achievements: tuple[AchievementResponse, ...]
+    by_id: Mapping[UUID, AchievementResponse]
+    active_visible: tuple[AchievementResponse, ...]
+    active_all: tuple[AchievementResponse, ...]
+    rules: AchievementRuleIndex
+
+    @classmethod
+    def build(
+        cls,
+        version: str | None,
+        achievements: Sequence[Achievement]
+    ) -> "CatalogSnapshot":
+        items = tuple(
+            AchievementResponse.model_validate(a) for a in achievements
+        )
+        active_all = tuple(a for a in items if a.is_active)
+        active_visible = tuple(a for a in active_all if not a.is_hidden)
+
+        # Muda sempre que o conteúdo muda (ETag), independente do Redis
+        fingerprint = hashlib.sha1(
+            "\n".join(a.model_dump_json() for a in items).encode("utf-8"),
+            usedforsecurity=False
+        ).hexdigest()
+
+        return cls(
+            version=version,
+            fingerprint=fingerprint,
+            loaded_at=time.monotonic(),
+            achievements=items,
+            by_id=MappingProxyType({a.id: a for a in items}),
+            active_visible=active_visible,
+            active_all=active_all,
+            # Mesmo conjunto avaliado historicamente no desbloqueio
+            rules=AchievementRuleIndex(active_visible)
+        )
+
+    def active(
+        self,
+        include_hidden: bool = False
+    ) -> tuple[AchievementResponse, ...]:
+        return self.active_all if include_hidden else self.active_visible
+
+    def get_active(self, achievement_id: UUID) -> AchievementResponse | None:
+        achievement = self.by_id.get(achievement_id)
+        if achievement is None or not achievement.is_active:
+            return None
+        return achievement
+
+    def by_category(
+        self,
+        category: AchievementCategory
+    ) -> list[AchievementResponse]:
+        return [a for a in self.active_all if a.category == category]
+
+    def by_rarity(
+        self,
+        rarity: AchievementRarity
+    ) -> list[AchievementResponse]:
+        return [a for a in self.active_all if a.rarity == rarity]
+
+
+class AchievementCatalog:
+    """
+    Cache do catálogo por processo, versionado por um contador no Redis.
+
+    Admins incrementam a versão a cada alteração; os workers só recarregam
+    do Postgres quando a versão muda. Sem Redis, o snapshot expira por idade
+    (`cache_ttl_stats`).
+
+    As estatísticas de raridade ficam junto do snapshot e são relidas a
+    cada `achievement_rarity_refresh_seconds`.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: CatalogSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rarity: RarityStats | None = None
+        self._rarity_lock = asyncio.Lock()
+
+    async def get(
+        self,
+        achievement_repo: AchievementRepository
+    ) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+
+        # Evita consultar a versão no Redis em toda leitura
+        if (
+            snapshot is not None
+            and now - self._checked_at < settings.achievement_catalog_check_seconds
+        ):
+            return snapshot
+
+        version = await cache.get(CATALOG_VERSION_KEY)
+        if snapshot is not None and not self._is_stale(snapshot, version, now):
+            self._checked_at = now
+            return snapshot
+
+        async with self._lock:
+            # Outro request pode ter recarregado enquanto aguardávamos
+            current = self._snapshot
+            if current is not None and not self._is_stale(current, version, now):
+                return current
+
+            achievements = await achievement_repo.list_catalog()
+            snapshot = CatalogSnapshot.build(version, achievements)
+            self._snapshot = snapshot
+            self._checked_at = now
+
+        logger.info(
+            "achievement_catalog_loaded",
+            extra={"event_data": {
+                "event": "achievement_catalog_loaded",
+                "version": version,
+                "achievements_count": len(snapshot.achievements)
+            }}
+        )
+        return snapshot
+
+    async def get_rarity(
+        self,
+        user_achievement_repo: UserAchievementRepository,
+        user_repo: UserRepository
+    ) -> RarityStats:
+        rarity = self._rarity
+        if (
+            rarity is not None
+            and time.monotonic() - rarity.loaded_at < settings.achievement_rarity_refresh_seconds
+        ):
+            return rarity
+
+        async with self._rarity_lock:
+            current = self._rarity
+            if (
+                current is not None
+                and time.monotonic() - current.loaded_at < settings.achievement_rarity_refresh_seconds
+            ):
+                return current
+
+            rarity = await load_rarity_stats(user_achievement_repo, user_repo)
+            self._rarity = rarity
+        return rarity
+
+    @staticmethod
+    def _is_stale(
+        snapshot: CatalogSnapshot,
+        version: str | None,
+        now: float
+    ) -> bool:
+        if version is None:
+            return now - snapshot.loaded_at >= settings.cache_ttl_stats
+        return version != snapshot.version
+
+    async def invalidate(self) -> None:
+        """Descarta o snapshot local e avisa os demais workers."""
+        self._snapshot = None
+        await cache.increment(CATALOG_VERSION_KEY)
+
+
+# singleton por worker
+achievement_catalog = AchievementCatalog()
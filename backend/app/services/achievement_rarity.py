@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Mapping, Optional
+from uuid import UUID
+
+from app.repositories.user_achievement_repository import UserAchievementRepository
+from app.repositories.user_repository import UserRepository
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import cache, CachePipeline
+from app.core.config import settings
+
+logger = logging.getLogger("app.achievement_rarity")
+
+# achievement_id -> quantidade de usuários que possuem a conquista
+HOLDERS_KEY = "achievements:holders"
+ACTIVE_USERS_KEY = "achievements:holders:active_users"
+RECONCILE_LOCK_KEY = "achievements:holders:reconcile_lock"
+
+
+@dataclass(frozen=True)
+class RarityStats:
+    holders: Mapping[UUID, int]
+    active_users: int
+    loaded_at: float
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Muda quando algum contador muda (ETag do catálogo com raridade)."""
+        parts = [str(self.active_users)] + sorted(
+            f"{achievement_id}={count}"
+            for achievement_id, count in self.holders.items()
+        )
+        return hashlib.sha1(
+            "|".join(parts).encode("utf-8"),
+            usedforsecurity=False
+        ).hexdigest()
+
+    def holders_count(self, achievement_id: UUID) -> int:
+        return self.holders.get(achievement_id, 0)
+
+    def holders_percentage(self, achievement_id: UUID) -> float:
+        if self.active_users <= 0:
+            return 0.0
+        percentage = self.holders_count(achievement_id) / self.active_users * 100
+        return round(min(percentage, 100.0), 1)
+
+
+async def record_achievement_unlocks(
+    increments: Mapping[UUID, int],
+    pipeline: Optional[CachePipeline] = None
+) -> None:
+    """Incrementa os contadores de quem possui cada conquista."""
+    increments = {
+        str(achievement_id): amount
+        for achievement_id, amount in increments.items()
+        if amount
+    }
+    if pipeline is not None:
+        pipeline.hincrby_many(HOLDERS_KEY, increments)
+        return
+    await cache.hincrby_many(HOLDERS_KEY, increments)
+
+
+async def record_achievement_revoke(
+    achievement_id: UUID,
+    pipeline: Optional[CachePipeline] = None
+) -> None:
+    if pipeline is not None:
+        pipeline.hincrby_many(HOLDERS_KEY, {str(achievement_id): -1})
+        return
+    await cache.hincrby_many(HOLDERS_KEY, {str(achievement_id): -1})
+
+
+async def load_rarity_stats(
+    user_achievement_repo: UserAchievementRepository,
+    user_repo: UserRepository
+) -> RarityStats:
+    """
+    Lê os contadores do Redis. Sem Redis (ou antes da primeira
+    reconciliação) calcula direto no Postgres.
+    """
+    raw_holders = await cache.hgetall(HOLDERS_KEY)
+    raw_active_users = await cache.get(ACTIVE_USERS_KEY)
+
+    if raw_active_users is not None:
+        holders = {}
+        for achievement_id, count in raw_holders.items():
+            try:
+                holders[UUID(achievement_id)] = max(int(count), 0)
+            except ValueError:
+                continue
+        active_users = int(raw_active_users)
+    else:
+        holders = await user_achievement_repo.count_holders_by_achievement()
+        active_users = await user_repo.count_active_users()
+
+    return RarityStats(
+        holders=MappingProxyType(holders),
+        active_users=active_users,
+        loaded_at=time.monotonic()
+    )
+
+
+async def reconcile_achievement_holders() -> None:
+    """
+    Recalcula os contadores a partir do Postgres, corrigindo desvios dos
+    incrementos (usuários desativados, falhas do Redis, etc.).
+
+    O lock garante uma única reconciliação por intervalo entre os workers.
+    """
+    lock_ttl = max(settings.achievement_rarity_reconcile_seconds // 2, 1)
+    if not await cache.set_if_absent(RECONCILE_LOCK_KEY, "1", ttl=lock_ttl):
+        return
+
+    async with AsyncSessionLocal() as db:
+        holders = await UserAchievementRepository(db).count_holders_by_achievement()
+        active_users = await UserRepository(db).count_active_users()
+
+    await cache.replace_hash(
+        HOLDERS_KEY,
+        {str(achievement_id): str(count) for achievement_id, count in holders.items()}
+    )
+    await cache.set(ACTIVE_USERS_KEY, str(active_users))
+
+    logger.info(
+        "achievement_holders_reconciled",
+        extra={"event_data": {
+            "event": "achievement_holders_reconciled",
+            "achievements_count": len(holders),
+            "active_users": active_users
+        }}
+    )
@@ -0,0 +1,81 @@
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Iterable, Mapping
+
+from app.schemas.achievement import AchievementResponse
+
+# Stats do usuário que podem ser usadas como criteria_type
+ACHIEVEMENT_STAT_FIELDS = (
+    "total_sessions",
+    "best_retention_time",
+    "current_streak",
+    "longest_streak",
+    "total_retention_time",
+)
+
+# criteria_type -> (valor antigo | None, valor novo)
+StatChanges = Mapping[str, tuple[int | None, int]]
+
+
+def extract_user_stats(user: Any) -> dict[str, int]:
+    return {field: getattr(user, field) for field in ACHIEVEMENT_STAT_FIELDS}
+
+
+def diff_user_stats(
+    before: Mapping[str, int],
+    after: Mapping[str, int]
+) -> dict[str, tuple[int, int]]:
+    return {
+        field: (before.get(field, 0), value)
+        for field, value in after.items()
+        if before.get(field, 0) != value
+    }
+
+
+class AchievementRuleIndex:
+    """
+    Índice de regras por criteria_type com limiares ordenados.
+
+    Dado o valor antigo e o novo de uma stat, a busca binária retorna
+    exatamente as conquistas cujo limiar foi cruzado no intervalo
+    (antigo, novo].
+    """
+
+    def __init__(self, achievements: Iterable[AchievementResponse]) -> None:
+        grouped: dict[str, list[AchievementResponse]] = defaultdict(list)
+        for achievement in achievements:
+            grouped[achievement.criteria_type].append(achievement)
+
+        self._rules: dict[
+            str,
+            tuple[tuple[int, ...], tuple[AchievementResponse, ...]]
+        ] = {}
+        for criteria_type, items in grouped.items():
+            items.sort(key=lambda a: a.criteria_value)
+            self._rules[criteria_type] = (
+                tuple(a.criteria_value for a in items),
+                tuple(items)
+            )
+
+    def crossed(
+        self,
+        criteria_type: str,
+        old_value: int | None,
+        new_value: int
+    ) -> tuple[AchievementResponse, ...]:
+        rule = self._rules.get(criteria_type)
+        if rule is None:
+            return ()
+
+        thresholds, items = rule
+        upper = bisect_right(thresholds, new_value)
+        lower = 0 if old_value is None else bisect_right(thresholds, old_value)
+        if upper <= lower:
+            return ()
+        return items[lower:upper]
+
+    def evaluate(self, changes: StatChanges) -> list[AchievementResponse]:
+        crossed: list[AchievementResponse] = []
+        for criteria_type, (old_value, new_value) in changes.items():
+            crossed.extend(self.crossed(criteria_type, old_value, new_value))
+        return crossed
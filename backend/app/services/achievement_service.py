@@ -1,5 +1,7 @@
+import json
 from uuid import UUID
 from typing import Sequence
+from datetime import datetime, timedelta, timezone
 
 from app.repositories.achievement_repository import AchievementRepository
 from app.repositories.user_achievement_repository import UserAchievementRepository
@@ -8,6 +10,7 @@ from app.schemas.achievement import (
     AchievementCreate,
     AchievementUpdate,
     AchievementResponse,
+    AchievementCatalogItem,
     AchievementProgress,
     UnlockedAchievement,
     LockedAchievement,
@@ -16,7 +19,30 @@ from app.schemas.achievement import (
     AchievementUnlocked
 )
 from app.models.achievement import AchievementCategory, AchievementRarity
-from app.core.redis_client import cache
+from app.services.achievement_catalog import (
+    CatalogSnapshot,
+    achievement_catalog
+)
+from app.services.achievement_rules import (
+    ACHIEVEMENT_STAT_FIELDS,
+    StatChanges,
+    extract_user_stats
+)
+from app.services.achievement_backfill import schedule_achievement_backfill
+from app.services.achievement_rarity import (
+    record_achievement_unlocks,
+    record_achievement_revoke
+)
+from app.core.redis_client import (
+    cache,
+    UNLOCKED_ACHIEVEMENTS_LOADED_FIELD,
+    get_unlocked_achievements_key,
+    add_unlocked_achievements,
+    remove_unlocked_achievement,
+    invalidate_user_stats
+)
+from app.core.cache_decorator import cached
+from app.core.http_cache import make_etag, etag_matches
 from app.core.config import settings
 
 
@@ -46,6 +72,11 @@ class AchievementService:
         achievement = await self.achievement_repo.create_achievement(
             **achievement_data.model_dump()
         )
+        await achievement_catalog.invalidate()
+
+        # Usuários que já atendem ao critério recebem sem nova sessão
+        if self._is_auto_unlocked(achievement):
+            schedule_achievement_backfill(achievement.id)
 
         return AchievementResponse.model_validate(achievement)
 
@@ -62,47 +93,79 @@ class AchievementService:
         if not update_data:
             return AchievementResponse.model_validate(achievement)
 
+        # Estado antes do update (o update sincroniza a instância da sessão)
+        was_auto_unlocked = self._is_auto_unlocked(achievement)
+        previous_criteria_value = achievement.criteria_value
+
         updated = await self.achievement_repo.update_by_id(
             achievement_id,
             **update_data
         )
+        await achievement_catalog.invalidate()
+
+        if self._is_auto_unlocked(updated) and (
+            not was_auto_unlocked
+            or updated.criteria_value < previous_criteria_value
+        ):
+            schedule_achievement_backfill(achievement_id)
 
         return AchievementResponse.model_validate(updated)
 
 
+    @staticmethod
+    def _is_auto_unlocked(achievement) -> bool:
+        # Mesmo conjunto avaliado pelo índice de regras do catálogo
+        return achievement.is_active and not achievement.is_hidden
+
+
     # list achievements
+    async def get_catalog_version(self, include_rarity: bool = False) -> str:
+        """
+        Versão do que as rotas públicas do catálogo servem (ETag). Vem do
+        snapshot do worker, sem consulta ao banco fora das recargas.
+        """
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        if not include_rarity:
+            return catalog.fingerprint
+
+        rarity = await achievement_catalog.get_rarity(
+            self.user_achievement_repo,
+            self.user_repo
+        )
+        return f"{catalog.fingerprint}:{rarity.fingerprint}"
+
     async def list_all_achievements(
         self,
         include_hidden: bool = False,
         active_only: bool = True
-    ) -> list[AchievementResponse]:
-        achievements = await self.achievement_repo.list_active_achievements(
-            include_hidden=include_hidden
+    ) -> list[AchievementCatalogItem]:
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        rarity = await achievement_catalog.get_rarity(
+            self.user_achievement_repo,
+            self.user_repo
         )
-
-        return [AchievementResponse.model_validate(a) for a in achievements]
+        return [
+            AchievementCatalogItem(
+                **achievement.model_dump(),
+                holders_count=rarity.holders_count(achievement.id),
+                holders_percentage=rarity.holders_percentage(achievement.id)
+            )
+            for achievement in catalog.active(include_hidden=include_hidden)
+        ]
 
     async def list_by_category(
         self,
         category: AchievementCategory
     ) -> list[AchievementResponse]:
-        achievements = await self.achievement_repo.list_by_category(
-            category,
-            active_only=True
-        )
-
-        return [AchievementResponse.model_validate(a) for a in achievements]
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        return catalog.by_category(category)
 
     async def list_by_rarity(
         self,
         rarity: AchievementRarity
     ) -> list[AchievementResponse]:
-        achievements = await self.achievement_repo.list_by_rarity(
-            rarity,
-            active_only=True
-        )
-
-        return [AchievementResponse.model_validate(a) for a in achievements]
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        return catalog.by_rarity(rarity)
 
 
     # user achievements
@@ -111,51 +174,152 @@ class AchievementService:
         user_id: UUID,
         use_cache: bool = True
     ) -> UserAchievementsResponse:
-        # Tenta cache
-        if use_cache:
-            cache_key = f"stats:{user_id}:achievements"
-            cached = await cache.get_json(cache_key)
-            if cached:
-                return UserAchievementsResponse.model_validate(cached)
+        response, _ = await self.get_user_achievements_with_etag(
+            user_id,
+            use_cache=use_cache
+        )
+        return response
 
-        # Busca conquistas desbloqueadas
-        user_achievements = await self.user_achievement_repo.get_user_achievements(
+    async def get_user_achievements_with_etag(
+        self,
+        user_id: UUID,
+        use_cache: bool = True,
+        if_none_match: str | None = None
+    ) -> tuple[UserAchievementsResponse | None, str]:
+        """
+        Monta a resposta a partir do catálogo compartilhado + registro
+        pequeno por usuário. Retorna (None, etag) quando o If-None-Match
+        do cliente ainda é válido.
+        """
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        unlocked_at = await self._get_unlocked_map(user_id, use_cache)
+        record = await self._get_user_achievement_record(user_id, use_cache)
+
+        recent_cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+        recent_ids = sorted(
+            str(achievement_id)
+            for achievement_id, timestamp in unlocked_at.items()
+            if timestamp > recent_cutoff
+        )
+
+        etag = make_etag(
+            catalog.fingerprint,
+            json.dumps(record, sort_keys=True),
+            ",".join(
+                f"{achievement_id}={timestamp.isoformat()}"
+                for achievement_id, timestamp in sorted(
+                    unlocked_at.items(),
+                    key=lambda item: str(item[0])
+                )
+            ),
+            ",".join(recent_ids)
+        )
+        if etag_matches(if_none_match, etag):
+            return None, etag
+
+        return self._build_user_achievements(
+            catalog,
+            unlocked_at,
+            record["stats"],
+            recent_cutoff
+        ), etag
+
+    # Registro por usuário com as stats atuais (desbloqueios ficam
+    # no hash achievements:unlocked:{user})
+    @cached(
+        "stats:{user_id}:achievement_state",
+        ttl=settings.cache_ttl_stats,
+        tags=("stats:{user_id}",)
+    )
+    async def _get_user_achievement_record(
+        self,
+        user_id: UUID,
+        use_cache: bool
+    ) -> dict:
+        user_stats = await self.user_repo.get_columns_by_id(
             user_id,
-            include_achievement=True
+            ACHIEVEMENT_STAT_FIELDS
         )
+        return {"stats": user_stats or {}}
 
-        unlocked_ids = {ua.achievement_id for ua in user_achievements}
+    async def _get_unlocked_map(
+        self,
+        user_id: UUID,
+        use_cache: bool = True
+    ) -> dict[UUID, datetime]:
+        """
+        Conquistas desbloqueadas (achievement_id -> unlocked_at) espelhadas
+        num hash do Redis; reconstruído do Postgres em caso de miss.
+        """
+        cache_key = get_unlocked_achievements_key(str(user_id))
+        if use_cache:
+            stored = await cache.hgetall(cache_key)
+            if stored.pop(UNLOCKED_ACHIEVEMENTS_LOADED_FIELD, None):
+                return {
+                    UUID(achievement_id): datetime.fromisoformat(timestamp)
+                    for achievement_id, timestamp in stored.items()
+                }
+
+        unlocked = await self.user_achievement_repo.get_unlocked_at_by_achievement(
+            user_id
+        )
 
-        # Monta lista de desbloqueadas
+        # HSET sem DEL: um desbloqueio concorrente não é sobrescrito
+        await add_unlocked_achievements(
+            str(user_id),
+            {
+                UNLOCKED_ACHIEVEMENTS_LOADED_FIELD: "1",
+                **{
+                    str(achievement_id): timestamp.isoformat()
+                    for achievement_id, timestamp in unlocked.items()
+                }
+            }
+        )
+
+        return unlocked
+
+    async def _get_unlocked_at(
+        self,
+        user_id: UUID,
+        achievement_id: UUID
+    ) -> datetime | None:
+        unlocked_at, loaded = await cache.hmget(
+            get_unlocked_achievements_key(str(user_id)),
+            [str(achievement_id), UNLOCKED_ACHIEVEMENTS_LOADED_FIELD]
+        )
+        if loaded:
+            return datetime.fromisoformat(unlocked_at) if unlocked_at else None
+
+        unlocked = await self._get_unlocked_map(user_id, use_cache=False)
+        return unlocked.get(achievement_id)
+
+    @staticmethod
+    def _build_user_achievements(
+        catalog: CatalogSnapshot,
+        unlocked_at: dict[UUID, datetime],
+        user_stats: dict[str, int],
+        recent_cutoff: datetime
+    ) -> UserAchievementsResponse:
+        # Desbloqueadas (inclui inativas/ocultas que o usuário já tem)
         unlocked = [
             UnlockedAchievement(
-                **ua.achievement.__dict__,
-                unlocked_at=ua.unlocked_at,
-                is_recent=ua.is_recent
+                **catalog.by_id[achievement_id].model_dump(),
+                unlocked_at=timestamp,
+                is_recent=timestamp > recent_cutoff
+            )
+            for achievement_id, timestamp in sorted(
+                unlocked_at.items(),
+                key=lambda item: item[1],
+                reverse=True
             )
-            for ua in user_achievements
+            if achievement_id in catalog.by_id
         ]
 
-        # Busca todas as conquistas ativas
-        all_achievements = await self.achievement_repo.list_active_achievements(
-            include_hidden=False
-        )
-
-        # Busca stats do usuário
-        user = await self.user_repo.get_by_id(user_id)
-        user_stats = {
-            "total_sessions": user.total_sessions,
-            "best_retention_time": user.best_retention_time,
-            "current_streak": user.current_streak,
-            "longest_streak": user.longest_streak,
-            "total_retention_time": user.total_retention_time
-        } if user else {}
-
-        # Monta lista de bloqueadas com progresso
+        # Bloqueadas com progresso
+        all_achievements = catalog.active(include_hidden=False)
         locked = []
         for achievement in all_achievements:
-            if achievement.id not in unlocked_ids:
-                # Calcula progresso
+            if achievement.id not in unlocked_at:
                 user_value = user_stats.get(achievement.criteria_type, 0)
                 target = achievement.criteria_value
 
@@ -167,90 +331,101 @@ class AchievementService:
 
                 locked.append(
                     LockedAchievement(
-                        **achievement.__dict__,
+                        **achievement.model_dump(),
                         progress=progress
                     )
                 )
 
-        # Calcula total de pontos
-        total_points = await self.user_achievement_repo.get_total_points(user_id)
-
-        response = UserAchievementsResponse(
+        return UserAchievementsResponse(
             unlocked=unlocked,
             locked=locked,
-            total_points=total_points,
+            total_points=sum(a.points for a in unlocked),
             unlocked_count=len(unlocked),
             total_count=len(all_achievements)
         )
 
-        # Salva no cache
-        if use_cache:
-            cache_key = f"stats:{user_id}:achievements"
-            await cache.set_json(
-                cache_key,
-                response.model_dump(mode='json'),
-                ttl=settings.cache_ttl_stats
-            )
-
-        return response
-
 
     # unlock achievements
     async def check_and_unlock_achievements(
         self,
-        user_id: UUID
+        user_id: UUID,
+        stat_changes: StatChanges | None = None
     ) -> list[AchievementUnlocked]:
-        # Busca IDs já desbloqueados
-        unlocked_ids = await self.user_achievement_repo.get_user_achievement_ids(
-            user_id
-        )
+        """
+        Com `stat_changes` avalia apenas os limiares cruzados pelas stats
+        alteradas; sem ele reavalia todas as stats a partir de zero.
+        """
+        if stat_changes is None:
+            user = await self.user_repo.get_by_id(user_id)
+            if not user:
+                return []
+            stat_changes = {
+                field: (None, value)
+                for field, value in extract_user_stats(user).items()
+            }
 
-        # Busca stats do usuário
-        user = await self.user_repo.get_by_id(user_id)
-        if not user:
+        if not stat_changes:
             return []
 
         user_stats = {
-            "total_sessions": user.total_sessions,
-            "best_retention_time": user.best_retention_time,
-            "current_streak": user.current_streak,
-            "longest_streak": user.longest_streak,
-            "total_retention_time": user.total_retention_time
+            field: new_value
+            for field, (_, new_value) in stat_changes.items()
         }
 
-        # Verifica quais podem ser desbloqueadas
-        unlockable = await self.achievement_repo.check_unlockable(
-            user_stats,
-            unlocked_ids
-        )
+        # Limiares cruzados via índice do catálogo em memória
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        candidates = catalog.rules.evaluate(stat_changes)
+        if not candidates:
+            return []
 
-        # Desbloqueia cada uma
-        newly_unlocked = []
-        for achievement in unlockable:
-            user_value = user_stats.get(achievement.criteria_type, 0)
+        # IDs já desbloqueados (hash no Redis)
+        unlocked_ids = (await self._get_unlocked_map(user_id)).keys()
+        unlockable = {
+            a.id: a for a in candidates if a.id not in unlocked_ids
+        }
+        if not unlockable:
+            return []
+
+        # Desbloqueia todas num único INSERT ... ON CONFLICT DO NOTHING;
+        # só as linhas realmente inseridas voltam (requests concorrentes
+        # não colidem na uq_user_achievement)
+        inserted = await self.user_achievement_repo.unlock_achievements_bulk(
+            user_id,
+            {
+                achievement.id: user_stats.get(achievement.criteria_type, 0)
+                for achievement in unlockable.values()
+            }
+        )
 
-            user_achievement = await self.user_achievement_repo.unlock_achievement(
-                user_id=user_id,
+        newly_unlocked = [
+            AchievementUnlocked(
                 achievement_id=achievement.id,
-                progress_value=user_value
+                name=achievement.name,
+                description=achievement.description,
+                icon=achievement.icon,
+                points=achievement.points,
+                rarity=achievement.rarity,
+                unlocked_at=inserted[achievement.id]
             )
+            for achievement in unlockable.values()
+            if achievement.id in inserted
+        ]
 
-            newly_unlocked.append(
-                AchievementUnlocked(
-                    achievement_id=achievement.id,
-                    name=achievement.name,
-                    description=achievement.description,
-                    icon=achievement.icon,
-                    points=achievement.points,
-                    rarity=achievement.rarity,
-                    unlocked_at=user_achievement.unlocked_at
+        # Espelha os novos desbloqueios no hash do usuário
+        if inserted:
+            async with cache.pipeline() as pipe:
+                await add_unlocked_achievements(
+                    str(user_id),
+                    {
+                        str(achievement_id): timestamp.isoformat()
+                        for achievement_id, timestamp in inserted.items()
+                    },
+                    pipeline=pipe
+                )
+                await record_achievement_unlocks(
+                    {achievement_id: 1 for achievement_id in inserted},
+                    pipeline=pipe
                 )
-            )
-
-        # Invalida cache se desbloqueou algo
-        if newly_unlocked:
-            cache_key = f"stats:{user_id}:achievements"
-            await cache.delete(cache_key)
 
         return newly_unlocked
 
@@ -261,48 +436,30 @@ class AchievementService:
         user_id: UUID,
         achievement_id: UUID
     ) -> AchievementDetail | None:
-        achievement = await self.achievement_repo.get_active_by_id(achievement_id)
+        catalog = await achievement_catalog.get(self.achievement_repo)
+        achievement = catalog.get_active(achievement_id)
         if not achievement:
             return None
 
-        # Verifica se usuário já tem
-        has_achievement = await self.user_achievement_repo.has_achievement(
-            user_id,
-            achievement_id
-        )
-
-        if has_achievement:
-            # Busca dados de desbloqueio
-            user_achievements = await self.user_achievement_repo.get_user_achievements(
-                user_id,
-                include_achievement=False
-            )
-
-            ua = next(
-                (ua for ua in user_achievements if ua.achievement_id == achievement_id),
-                None
-            )
+        # Verifica se usuário já tem (hash no Redis)
+        unlocked_at = await self._get_unlocked_at(user_id, achievement_id)
 
+        if unlocked_at is not None:
             return AchievementDetail(
-                **achievement.__dict__,
+                **achievement.model_dump(),
                 unlocked=True,
-                unlocked_at=ua.unlocked_at if ua else None,
+                unlocked_at=unlocked_at,
                 progress=None
             )
         else:
             # Calcula progresso
-            user = await self.user_repo.get_by_id(user_id)
-            if not user:
+            user_stats = await self.user_repo.get_columns_by_id(
+                user_id,
+                ACHIEVEMENT_STAT_FIELDS
+            )
+            if not user_stats:
                 return None
 
-            user_stats = {
-                "total_sessions": user.total_sessions,
-                "best_retention_time": user.best_retention_time,
-                "current_streak": user.current_streak,
-                "longest_streak": user.longest_streak,
-                "total_retention_time": user.total_retention_time
-            }
-
             user_value = user_stats.get(achievement.criteria_type, 0)
             target = achievement.criteria_value
 
@@ -313,7 +470,7 @@ class AchievementService:
             )
 
             return AchievementDetail(
-                **achievement.__dict__,
+                **achievement.model_dump(),
                 unlocked=False,
                 unlocked_at=None,
                 progress=progress
@@ -332,14 +489,45 @@ class AchievementService:
 
 
     # admin operations
+    async def revoke_achievement(
+        self,
+        user_id: UUID,
+        achievement_id: UUID
+    ) -> bool:
+        revoked = await self.user_achievement_repo.revoke_achievement(
+            user_id,
+            achievement_id
+        )
+        if revoked:
+            async with cache.pipeline() as pipe:
+                await remove_unlocked_achievement(
+                    str(user_id),
+                    str(achievement_id),
+                    pipeline=pipe
+                )
+                await record_achievement_revoke(achievement_id, pipeline=pipe)
+                await invalidate_user_stats(str(user_id), pipeline=pipe)
+        return revoked
+
     async def deactivate_achievement(
         self,
         achievement_id: UUID
     ) -> bool:
-        return await self.achievement_repo.deactivate_achievement(achievement_id)
+        success = await self.achievement_repo.deactivate_achievement(
+            achievement_id
+        )
+        if success:
+            await achievement_catalog.invalidate()
+        return success
 
     async def activate_achievement(
         self,
         achievement_id: UUID
     ) -> bool:
-        return await self.achievement_repo.activate_achievement(achievement_id)
\ No newline at end of file
+        success = await self.achievement_repo.activate_achievement(
+            achievement_id
+        )
+        if success:
+            await achievement_catalog.invalidate()
+            schedule_achievement_backfill(achievement_id)
+        return success
@@ -1,4 +1,6 @@
+import logging
 from uuid import UUID
+from dataclasses import dataclass
 from datetime import timedelta
 from jose import JWTError
 
@@ -6,21 +8,35 @@ from app.repositories.user_repository import UserRepository
 from app.schemas.auth import UserRegister, UserLogin, TokenResponse
 from app.schemas.user import UserLoginResponse
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    password_hasher,
     create_access_token,
     create_refresh_token,
     decode_token,
     verify_token_type,
-    create_token_pair
+    create_token_pair,
+    new_device_id
 )
-from app.core.redis_client import (
-    store_refresh_token,
-    get_refresh_token,
-    revoke_refresh_token
+from app.core.redis_client import get_refresh_token, revoke_refresh_token
+from app.core.refresh_tokens import (
+    RotationResult,
+    register_refresh_token,
+    rotate_refresh_token,
+    revoke_device,
+    revoke_all_devices
 )
+from app.core.user_status import UserStatus, user_status_cache
+from app.core.token_denylist import token_denylist
 from app.core.config import settings
 
+logger = logging.getLogger("app.auth")
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    user_id: UUID
+    is_admin: bool
+    device_id: str | None = None
+
 
 class AuthService:
     def __init__(self, user_repo: UserRepository):
@@ -45,7 +61,7 @@ class AuthService:
                 raise ValueError("Username já cadastrado")
 
         # Hash da senha
-        password_hash = get_password_hash(user_data.password)
+        password_hash = await password_hasher.hash(user_data.password)
 
         # Cria usuário
         user = await self.user_repo.create(
@@ -57,12 +73,19 @@ class AuthService:
             is_verified=False  # Pode implementar verificação de email depois
         )
 
-        # Gera tokens
-        tokens = create_token_pair(str(user.id))
+        # Gera tokens (cada login é um novo device)
+        device_id = new_device_id()
+        tokens = create_token_pair(
+            str(user.id),
+            user.token_version,
+            user.is_admin,
+            device_id
+        )
 
-        # Armazena refresh token no Redis
-        await store_refresh_token(
+        # Registra o refresh token do device no Redis
+        await register_refresh_token(
             str(user.id),
+            device_id,
             tokens["refresh_token"]
         )
 
@@ -97,7 +120,7 @@ class AuthService:
             raise ValueError("Email ou senha incorretos")
 
         # Verifica senha
-        if not verify_password(login_data.password, user.password_hash):
+        if not await password_hasher.verify(login_data.password, user.password_hash):
             raise ValueError("Email ou senha incorretos")
 
         # Verifica se está ativo
@@ -108,12 +131,19 @@ class AuthService:
         if user.is_deleted:
             raise ValueError("Conta não encontrada")
 
-        # Gera tokens
-        tokens = create_token_pair(str(user.id))
+        # Gera tokens (cada login é um novo device)
+        device_id = new_device_id()
+        tokens = create_token_pair(
+            str(user.id),
+            user.token_version,
+            user.is_admin,
+            device_id
+        )
 
-        # Armazena refresh token (substitui o antigo se existir)
-        await store_refresh_token(
+        # Registra o device (os demais continuam logados)
+        await register_refresh_token(
             str(user.id),
+            device_id,
             tokens["refresh_token"]
         )
 
@@ -140,7 +170,13 @@ class AuthService:
     async def refresh_access_token(
         self,
         refresh_token: str
-    ) -> str:
+    ) -> tuple[str, str]:
+        """
+        Retorna (access_token, refresh_token rotacionado). Se o token
+        anterior for reapresentado dentro da janela de tolerância
+        (refreshes concorrentes do mesmo device), o refresh é o mesmo já
+        emitido na rotação.
+        """
         try:
             # Decodifica token
             payload = decode_token(refresh_token)
@@ -153,35 +189,118 @@ class AuthService:
             if not user_id:
                 raise ValueError("Token inválido")
 
-            # Verifica se refresh token está armazenado no Redis
-            stored_token = await get_refresh_token(user_id)
-            if not stored_token or stored_token != refresh_token:
-                raise ValueError("Refresh token inválido ou revogado")
-
             # Verifica se usuário ainda existe e está ativo
-            user = await self.user_repo.get_active_by_id(UUID(user_id))
-            if not user:
+            status = await self._get_user_status(UUID(user_id))
+            if not status.can_authenticate:
                 raise ValueError("Usuário inválido ou inativo")
 
+            device_id = payload.get("did")
+            if device_id:
+                new_refresh_token = await self._rotate_refresh_token(
+                    user_id,
+                    device_id,
+                    refresh_token
+                )
+            else:
+                # Token legado (um por usuário): migra para o registro de devices
+                stored_token = await get_refresh_token(user_id)
+                if not stored_token or stored_token != refresh_token:
+                    raise ValueError("Refresh token inválido ou revogado")
+
+                device_id = new_device_id()
+                new_refresh_token = create_refresh_token(user_id, device_id)
+                await register_refresh_token(user_id, device_id, new_refresh_token)
+                await revoke_refresh_token(user_id)
+
             # Gera novo access token
-            new_access_token = create_access_token(subject=user_id)
+            new_access_token = create_access_token(
+                subject=user_id,
+                token_version=status.token_version,
+                is_admin=status.is_admin,
+                device_id=device_id
+            )
 
-            return new_access_token
+            return new_access_token, new_refresh_token
 
         except JWTError as e:
             raise ValueError(f"Token inválido: {str(e)}")
 
 
+    async def _rotate_refresh_token(
+        self,
+        user_id: str,
+        device_id: str,
+        refresh_token: str
+    ) -> str:
+        result, new_refresh_token = await rotate_refresh_token(
+            user_id,
+            device_id,
+            refresh_token
+        )
+
+        if result in (RotationResult.ROTATED, RotationResult.GRACE):
+            return new_refresh_token
+
+        if result == RotationResult.REUSED:
+            # Token já rotacionado foi reapresentado: provável roubo.
+            # O script já revogou todos os devices; derruba os access tokens.
+            logger.warning(
+                "refresh_token_reuse_detected",
+                extra={"event_data": {
+                    "event": "refresh_token_reuse_detected",
+                    "user_id": user_id,
+                    "device_id": device_id
+                }}
+            )
+            await self.revoke_access_tokens(UUID(user_id))
+            raise ValueError("Refresh token reutilizado; sessões encerradas")
+
+        raise ValueError("Refresh token inválido ou revogado")
+
+
     # logout
-    async def logout_user(self, user_id: UUID) -> bool:
+    async def logout_user(self, principal: AuthenticatedUser) -> bool:
+        user_id = principal.user_id
+
+        if principal.device_id:
+            # Só o device atual: todos os access tokens dele vão para a denylist
+            await token_denylist.revoke_device(principal.device_id)
+            return await revoke_device(str(user_id), principal.device_id)
+
+        # Token legado (sem did): derruba todos os access tokens (`ver`)
+        await self.revoke_access_tokens(user_id)
         return await revoke_refresh_token(str(user_id))
 
+    async def logout_all_devices(self, user_id: UUID) -> bool:
+        await self.revoke_access_tokens(user_id)
+        await revoke_refresh_token(str(user_id))
+        return await revoke_all_devices(str(user_id))
+
+    async def revoke_access_tokens(self, user_id: UUID) -> None:
+        await self.user_repo.increment_token_version(user_id)
+        await user_status_cache.invalidate(user_id)
+
+
+    # user status (cache)
+    async def _get_user_status(self, user_id: UUID) -> UserStatus:
+        return await user_status_cache.get(
+            user_id,
+            self.user_repo.get_auth_status
+        )
+
 
     # verify token
     async def verify_access_token(
         self,
         access_token: str
     ) -> UUID:
+        principal = await self.authenticate_access_token(access_token)
+        return principal.user_id
+
+    async def authenticate_access_token(
+        self,
+        access_token: str
+    ) -> AuthenticatedUser:
         try:
             payload = decode_token(access_token)
 
@@ -192,12 +311,28 @@ class AuthService:
             if not user_id:
                 raise ValueError("Token inválido")
 
-            # Verifica se usuário existe e está ativo
-            user = await self.user_repo.get_active_by_id(UUID(user_id))
-            if not user:
+            # Assinatura + status em cache: sem consulta ao banco no caminho comum
+            status = await self._get_user_status(UUID(user_id))
+            if not status.can_authenticate:
                 raise ValueError("Usuário inválido ou inativo")
 
-            return UUID(user_id)
+            # Tokens anteriores a `ver` equivalem à versão 0
+            if payload.get("ver", 0) != status.token_version:
+                raise ValueError("Token revogado")
+
+            # Logout de um device (lookup local, sem ida ao Redis)
+            if (
+                token_denylist.is_revoked(payload.get("jti"))
+                or token_denylist.is_device_revoked(payload.get("did"))
+            ):
+                raise ValueError("Token revogado")
+
+            # Admin exige a claim e o papel atual (revogação imediata)
+            return AuthenticatedUser(
+                user_id=UUID(user_id),
+                is_admin=bool(payload.get("adm")) and status.is_admin,
+                device_id=payload.get("did")
+            )
 
         except JWTError as e:
             raise ValueError(f"Token inválido: {str(e)}")
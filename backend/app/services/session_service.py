@@ -16,7 +16,12 @@ from app.schemas.session import (
     ProgressResponse,
     MoodCorrelationResponse
 )
-from app.core.redis_client import cache, invalidate_user_stats
+from app.services.achievement_rules import (
+    diff_user_stats,
+    extract_user_stats
+)
+from app.core.redis_client import invalidate_user_stats
+from app.core.cache_decorator import cached
 from app.core.config import settings
 
 
@@ -29,11 +34,16 @@ class SessionService:
         self.session_repo = session_repo
         self.user_repo = user_repo
 
-    async def _recompute_user_stats(self, user_id: UUID) -> None:
+    async def _recompute_user_stats(
+        self,
+        user_id: UUID
+    ) -> dict[str, tuple[int, int]]:
+        """Recalcula os agregados e retorna as stats que mudaram (antigo, novo)."""
         user = await self.user_repo.get_by_id(user_id)
         if not user:
-            return
+            return {}
 
+        stats_before = extract_user_stats(user)
         sessions = await self.session_repo.get_user_sessions_chronological(user_id)
 
         if not sessions:
@@ -46,7 +56,10 @@ class SessionService:
                 longest_streak=0,
                 last_session_date=None
             )
-            return
+            return diff_user_stats(
+                stats_before,
+                dict.fromkeys(stats_before, 0)
+            )
 
         total_sessions = len({s.session_group_id for s in sessions})
         total_retention_time = sum(s.retention_time for s in sessions)
@@ -56,16 +69,22 @@ class SessionService:
         unique_days = sorted({s.session_date.date() for s in sessions})
         current_streak, longest_streak = self._calculate_streaks(unique_days)
 
+        stats_after = {
+            "total_sessions": total_sessions,
+            "total_retention_time": total_retention_time,
+            "best_retention_time": best_retention_time,
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+        }
+
         await self.user_repo.update_by_id(
             user_id,
-            total_sessions=total_sessions,
-            total_retention_time=total_retention_time,
-            best_retention_time=best_retention_time,
-            current_streak=current_streak,
-            longest_streak=longest_streak,
-            last_session_date=last_session_date
+            last_session_date=last_session_date,
+            **stats_after
         )
 
+        return diff_user_stats(stats_before, stats_after)
+
     @staticmethod
     def _calculate_streaks(unique_days: list[date]) -> tuple[int, int]:
         if not unique_days:
@@ -100,7 +119,7 @@ class SessionService:
         self,
         user_id: UUID,
         session_data: SessionCreate
-    ) -> SessionDetailResponse:
+    ) -> tuple[SessionDetailResponse, dict[str, tuple[int, int]]]:
         # Cria sessão. Quando o cliente não envia um grupo, o backend
         # cria um grupo próprio para preservar compatibilidade com sessões
         # legadas de round único.
@@ -115,7 +134,7 @@ class SessionService:
         )
 
         # Atualiza stats do usuário usando fonte única de verdade (recompute)
-        await self._recompute_user_stats(user_id)
+        stat_changes = await self._recompute_user_stats(user_id)
 
         # Invalida cache
         await invalidate_user_stats(str(user_id))
@@ -130,7 +149,7 @@ class SessionService:
         return SessionDetailResponse(
             **session.__dict__,
             is_personal_best=is_personal_best
-        )
+        ), stat_changes
 
 
     # get session
@@ -245,19 +264,17 @@ class SessionService:
 
 
     # statistics
+    @cached(
+        "stats:{user_id}:summary",
+        ttl=settings.cache_ttl_stats,
+        model=SessionsSummary,
+        tags=("stats:{user_id}",)
+    )
     async def get_sessions_summary(
         self,
         user_id: UUID,
         use_cache: bool = True
     ) -> SessionsSummary:
-        # Tenta cache
-        if use_cache:
-            cache_key = f"stats:{user_id}:summary"
-            cached = await cache.get_json(cache_key)
-            if cached:
-                return SessionsSummary.model_validate(cached)
-
-        # Busca dados
         total_stats = await self.session_repo.get_user_total_stats(user_id)
         last_7_days = await self.session_repo.get_user_stats_by_period(
             user_id, 7
@@ -268,7 +285,7 @@ class SessionService:
 
         user = await self.user_repo.get_by_id(user_id)
 
-        summary = SessionsSummary(
+        return SessionsSummary(
             total_sessions=total_stats["total_sessions"],
             total_retention_time=total_stats["total_retention_time"],
             average_retention_time=total_stats["average_retention_time"],
@@ -280,17 +297,6 @@ class SessionService:
             last_30_days=PeriodStats(**last_30_days)
         )
 
-        # Salva no cache
-        if use_cache:
-            cache_key = f"stats:{user_id}:summary"
-            await cache.set_json(
-                cache_key,
-                summary.model_dump(mode='json'),
-                ttl=settings.cache_ttl_stats
-            )
-
-        return summary
-
 
     # progress tracking
     async def get_progress(
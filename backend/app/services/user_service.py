@@ -11,8 +11,10 @@ from app.schemas.user import (
     UserStatsResponse,
     UserProfile
 )
-from app.core.security import get_password_hash
-from app.core.redis_client import cache, invalidate_user_stats
+from app.core.security import password_hasher
+from app.core.redis_client import invalidate_user, invalidate_user_stats
+from app.core.cache_decorator import cached
+from app.core.user_status import user_status_cache
 from app.core.config import settings
 
 
@@ -35,6 +37,12 @@ class UserService:
             return None
         return UserResponse.model_validate(user)
 
+    @cached(
+        "user:{user_id}:active",
+        ttl=settings.cache_ttl_user,
+        model=UserResponse | None,
+        tags=("user:{user_id}", "stats:{user_id}")
+    )
     async def get_active_user(self, user_id: UUID) -> UserResponse | None:
         user = await self.user_repo.get_active_by_id(user_id)
         if not user:
@@ -69,34 +77,22 @@ class UserService:
 
 
     # user stats
+    @cached(
+        "stats:{user_id}:full",
+        ttl=settings.cache_ttl_stats,
+        model=UserStatsResponse | None,
+        tags=("stats:{user_id}",)
+    )
     async def get_user_stats(
         self,
         user_id: UUID,
         use_cache: bool = True
     ) -> UserStatsResponse | None:
-        # Tenta cache primeiro
-        if use_cache:
-            cache_key = f"stats:{user_id}:full"
-            cached = await cache.get_json(cache_key)
-            if cached:
-                return UserStatsResponse.model_validate(cached)
-
         user = await self.user_repo.get_by_id(user_id)
         if not user or user.is_deleted:
             return None
 
-        stats = UserStatsResponse.model_validate(user)
-
-        # Salva no cache
-        if use_cache:
-            cache_key = f"stats:{user_id}:full"
-            await cache.set_json(
-                cache_key,
-                stats.model_dump(mode='json'),
-                ttl=settings.cache_ttl_stats
-            )
-
-        return stats
+        return UserStatsResponse.model_validate(user)
 
     async def get_user_profile(
         self,
@@ -111,6 +107,13 @@ class UserService:
 
 
     # leaderboards
+    # Dependem das stats de todos os usuários: expiram pelo TTL em vez de
+    # serem invalidados a cada sessão
+    @cached(
+        "leaderboard:retention:{limit}",
+        ttl=settings.http_cache_leaderboard_max_age,
+        model=list[UserStatsResponse]
+    )
     async def get_top_by_retention(
         self,
         limit: int = 10
@@ -118,6 +121,11 @@ class UserService:
         users = await self.user_repo.get_top_users_by_retention(limit)
         return [UserStatsResponse.model_validate(u) for u in users]
 
+    @cached(
+        "leaderboard:streak:{limit}",
+        ttl=settings.http_cache_leaderboard_max_age,
+        model=list[UserStatsResponse]
+    )
     async def get_top_by_streak(
         self,
         limit: int = 10
@@ -125,6 +133,11 @@ class UserService:
         users = await self.user_repo.get_top_users_by_streak(limit)
         return [UserStatsResponse.model_validate(u) for u in users]
 
+    @cached(
+        "leaderboard:active:{limit}",
+        ttl=settings.http_cache_leaderboard_max_age,
+        model=list[UserStatsResponse]
+    )
     async def get_most_active(
         self,
         limit: int = 10
@@ -138,12 +151,20 @@ class UserService:
         success = await self.user_repo.deactivate_user(user_id)
         if success:
             await invalidate_user_stats(str(user_id))
+            await user_status_cache.invalidate(user_id)
         return success
 
     async def activate_user(self, user_id: UUID) -> bool:
         success = await self.user_repo.activate_user(user_id)
         if success:
             await invalidate_user_stats(str(user_id))
+            await user_status_cache.invalidate(user_id)
+        return success
+
+    async def set_admin(self, user_id: UUID, is_admin: bool) -> bool:
+        success = await self.user_repo.set_admin(user_id, is_admin)
+        if success:
+            await user_status_cache.invalidate(user_id)
         return success
 
     async def delete_user(self, user_id: UUID) -> bool:
@@ -151,6 +172,7 @@ class UserService:
         success = await self.user_repo.soft_delete_by_id(user_id)
         if success:
             await invalidate_user_stats(str(user_id))
+            await user_status_cache.invalidate(user_id)
         return success
 
 
@@ -170,17 +192,26 @@ class UserService:
         user_id: UUID,
         new_password: str
     ) -> bool:
-        password_hash = get_password_hash(new_password)
+        password_hash = await password_hasher.hash(new_password)
         updated = await self.user_repo.update_by_id(
             user_id,
             password_hash=password_hash
         )
-        return updated is not None
+        if updated is None:
+            return False
+
+        # Troca de senha encerra as sessões abertas
+        await self.user_repo.increment_token_version(user_id)
+        await user_status_cache.invalidate(user_id)
+        return True
 
 
     # verify email
     async def verify_email(self, user_id: UUID) -> bool:
-        return await self.user_repo.verify_email(user_id)
+        verified = await self.user_repo.verify_email(user_id)
+        if verified:
+            await invalidate_user(str(user_id))
+        return verified
 
 
     # update avatar
@@ -0,0 +1,51 @@
+import os
+from contextlib import contextmanager
+
+# Settings obrigatórias para importar o app sem .env; o backend em memória
+# dispensa Redis e senha
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+import pytest
+
+from app.core.memory_backend import InMemoryRedis
+from app.core.redis_client import cache
+
+
+@pytest.fixture(params=["lua", "memory"])
+def redis_backend(request):
+    """
+    Roda o teste contra os scripts Lua (fakeredis + lupa) e contra as
+    implementações Python do InMemoryRedis: os dois precisam concordar.
+    """
+    if request.param == "lua":
+        pytest.importorskip("lupa")
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.aioredis.FakeRedis(
+            server=fakeredis.FakeServer(),
+            decode_responses=True
+        )
+    else:
+        client = InMemoryRedis()
+
+    with _using(client):
+        yield client
+
+
+@pytest.fixture
+def memory_redis():
+    client = InMemoryRedis()
+    with _using(client):
+        yield client
+
+
+@contextmanager
+def _using(client):
+    previous = cache.redis, cache.local, cache._scripts
+    cache.redis, cache.local, cache._scripts = client, None, {}
+    try:
+        yield
+    finally:
+        cache.redis, cache.local, cache._scripts = previous
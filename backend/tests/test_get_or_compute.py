@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.redis_client import cache
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _store_stale(key: str, value, stale_ttl: int = 60) -> None:
+    """Envelope com expiração lógica vencida, ainda na janela de stale."""
+    await cache.set_json(
+        key,
+        {"v": value, "d": 0.01, "e": time.time() - 1},
+        ttl=stale_ttl
+    )
+
+
+async def test_concurrent_misses_compute_once(memory_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(
+        cache.get_or_compute("stats:1:summary", compute, ttl=60)
+        for _ in range(10)
+    ))
+
+    assert calls == 1
+    assert results == [{"value": 1}] * 10
+    assert await cache.get_or_compute("stats:1:summary", compute, ttl=60) == {"value": 1}
+
+
+async def test_stale_value_served_while_other_worker_refreshes(memory_redis):
+    await _store_stale("stats:1:summary", "old")
+    await cache.set("lock:stats:1:summary", "other-worker", ttl=5)
+
+    async def compute():
+        raise AssertionError("quem não tem o lock não recalcula")
+
+    value = await cache.get_or_compute("stats:1:summary", compute, ttl=60, stale_ttl=60)
+
+    assert value == "old"
+
+
+async def test_compute_error_reaches_every_waiter(memory_redis):
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("stats:1:summary", compute, ttl=60) for _ in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "stats:1:summary" not in cache._inflight
+
+
+async def test_waiter_joining_lost_early_refresh_gets_a_value(memory_redis, monkeypatch):
+    """
+    Um refresh do stale window (wait=False) perde o lock para outro
+    worker; um request concorrente cujo get_json errou (TTL venceu no
+    meio) entrou no mesmo single-flight e precisa receber um valor, não o
+    sentinela interno.
+    """
+    key = "stats:1:summary"
+    await _store_stale(key, "old")
+    await cache.set(f"lock:{key}", "other-worker", ttl=5)
+
+    entered, gate = asyncio.Event(), asyncio.Event()
+    acquire_lock = cache._acquire_lock
+
+    async def slow_first_acquire(lock_key, token):
+        if not entered.is_set():
+            entered.set()
+            await gate.wait()
+        return await acquire_lock(lock_key, token)
+
+    monkeypatch.setattr(cache, "_acquire_lock", slow_first_acquire)
+
+    async def compute():
+        return "fresh"
+
+    refresher = asyncio.create_task(
+        cache.get_or_compute(key, compute, ttl=60, stale_ttl=60)
+    )
+    await entered.wait()
+
+    # TTL do Redis venceu: o próximo request erra o get_json e aguarda
+    await cache.delete(key)
+    waiter = asyncio.create_task(
+        cache.get_or_compute(key, compute, ttl=60, stale_ttl=60)
+    )
+    await asyncio.sleep(0)
+
+    gate.set()
+    assert await refresher == "old"
+
+    # o outro worker termina sem publicar valor
+    await cache.delete(f"lock:{key}")
+    assert await asyncio.wait_for(waiter, timeout=2) == "fresh"
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.circuit_breaker import CLOSED, OPEN
+from app.core.redis_client import (
+    PoolExhaustedError,
+    WaitingConnectionPool,
+    _guarded,
+    redis_breaker
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+class _Connection:
+    def __init__(self, **kwargs) -> None:
+        pass
+
+    async def connect(self) -> None:
+        pass
+
+    async def can_read_destructive(self) -> bool:
+        return False
+
+    async def disconnect(self) -> None:
+        pass
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(redis_breaker, "failure_threshold", 2)
+    redis_breaker.record_success()
+    yield redis_breaker
+    redis_breaker.record_success()
+
+
+def _pool(max_connections: int = 1) -> WaitingConnectionPool:
+    return WaitingConnectionPool(
+        timeout=0.05,
+        connection_class=_Connection,
+        max_connections=max_connections
+    )
+
+
+async def test_pool_waits_for_a_released_connection():
+    pool = _pool()
+    first = await pool.get_connection("GET")
+
+    waiting = asyncio.create_task(pool.get_connection("GET"))
+    await asyncio.sleep(0.01)
+    await pool.release(first)
+
+    assert await waiting is first
+
+
+async def test_exhausted_pool_does_not_open_the_circuit(breaker):
+    pool = _pool()
+    await pool.get_connection("GET")
+
+    for _ in range(breaker.failure_threshold + 1):
+        with pytest.raises(PoolExhaustedError):
+            await _guarded(lambda: pool.get_connection("GET"))
+
+    assert breaker.state == CLOSED
+
+
+async def test_connection_errors_open_the_circuit(breaker):
+    async def refused():
+        raise RedisConnectionError("Connection refused")
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RedisConnectionError):
+            await _guarded(refused)
+
+    assert breaker.state == OPEN
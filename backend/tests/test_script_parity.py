@@ -0,0 +1,155 @@
+import math
+
+import pytest
+
+from app.core.config import settings
+from app.core.login_throttle import REGISTER_FAILURE_SCRIPT
+from app.core.rate_limit import TOKEN_BUCKET_SCRIPT
+from app.core.redis_client import (
+    RELEASE_LOCK_SCRIPT,
+    cache,
+    get_generation_key,
+    invalidate_tags
+)
+from app.core.refresh_tokens import (
+    REGISTER_SCRIPT,
+    RotationResult,
+    get_refresh_registry_key,
+    hash_refresh_token,
+    register_refresh_token,
+    rotate_refresh_token
+)
+from app.core.security import create_refresh_token
+
+pytestmark = pytest.mark.asyncio
+
+
+# refresh tokens
+async def test_register_evicts_least_recently_used_device(redis_backend):
+    key = get_refresh_registry_key("user")
+    for device, last_used in (("d1", 300), ("d2", 100), ("d3", 200)):
+        await cache.run_script(
+            REGISTER_SCRIPT,
+            keys=[key],
+            args=[device, f"{last_used}:{device}hash", 3, 60]
+        )
+    await cache.hset_many(key, {"d2:prev": "100:oldhash"})
+
+    evicted = await cache.run_script(
+        REGISTER_SCRIPT,
+        keys=[key],
+        args=["d4", "400:d4hash", 3, 60]
+    )
+
+    assert evicted == 1
+    assert await cache.hgetall(key) == {
+        "d1": "300:d1hash",
+        "d3": "200:d3hash",
+        "d4": "400:d4hash",
+    }
+    assert 0 < await cache.ttl(key) <= 60
+
+
+async def test_rotate_then_grace_returns_the_same_token(redis_backend):
+    token = create_refresh_token("user", "device")
+    await register_refresh_token("user", "device", token)
+
+    result, rotated = await rotate_refresh_token("user", "device", token)
+    assert result == RotationResult.ROTATED
+
+    # Refresh concorrente com o token anterior: recebe o já rotacionado
+    result, again = await rotate_refresh_token("user", "device", token)
+    assert result == RotationResult.GRACE
+    assert again == rotated
+
+    stored = await cache.hgetall(get_refresh_registry_key("user"))
+    assert stored["device"].endswith(hash_refresh_token(rotated))
+    assert stored["device:prev"].endswith(hash_refresh_token(token))
+
+    result, _ = await rotate_refresh_token("user", "device", rotated)
+    assert result == RotationResult.ROTATED
+
+
+async def test_reuse_after_grace_revokes_all_devices(redis_backend, monkeypatch):
+    monkeypatch.setattr(settings, "refresh_reuse_grace_seconds", -1)
+    token = create_refresh_token("user", "device")
+    await register_refresh_token("user", "device", token)
+    await register_refresh_token("user", "other", create_refresh_token("user", "other"))
+    await rotate_refresh_token("user", "device", token)
+
+    result, rotated = await rotate_refresh_token("user", "device", token)
+
+    assert result == RotationResult.REUSED
+    assert rotated is None
+    assert not await cache.exists(get_refresh_registry_key("user"))
+
+
+async def test_rotate_unknown_device_is_invalid(redis_backend):
+    token = create_refresh_token("user", "device")
+    await register_refresh_token("user", "device", token)
+
+    result, rotated = await rotate_refresh_token("user", "missing", token)
+
+    assert result == RotationResult.INVALID
+    assert rotated is None
+    assert await cache.exists(get_refresh_registry_key("user"))
+
+
+# rate limit
+async def test_token_bucket_consumes_and_blocks(redis_backend):
+    rate_per_ms = 2 / 60000
+    results = [
+        await cache.run_script(
+            TOKEN_BUCKET_SCRIPT,
+            keys=["ratelimit:test"],
+            args=[2, rate_per_ms, 1]
+        )
+        for _ in range(3)
+    ]
+
+    assert [list(map(int, result)) for result in results[:2]] == [[1, 0, 1], [1, 0, 0]]
+    allowed, retry_after_ms, remaining = map(int, results[2])
+    assert (allowed, remaining) == (0, 0)
+    assert 0 < retry_after_ms <= math.ceil(1 / rate_per_ms)
+    assert 0 < await cache.ttl("ratelimit:test") <= 60
+
+
+# login throttle
+async def test_login_failures_lock_out_exponentially(redis_backend):
+    keys = ["login_failures:test", "login_lock:test"]
+    lockouts = [
+        await cache.run_script(REGISTER_FAILURE_SCRIPT, keys=keys, args=[60, 3, 10, 25])
+        for _ in range(5)
+    ]
+
+    assert lockouts == [0, 0, 10, 20, 25]
+    assert await cache.get("login_failures:test") == "5"
+    assert 0 < await cache.ttl("login_lock:test") <= 25
+    assert 25 < await cache.ttl("login_failures:test") <= 60
+
+
+# cache
+async def test_lock_release_requires_owner_token(redis_backend):
+    await cache.set("lock:key", "owner", ttl=10)
+
+    assert await cache.run_script(RELEASE_LOCK_SCRIPT, keys=["lock:key"], args=["other"]) == 0
+    assert await cache.get("lock:key") == "owner"
+
+    assert await cache.run_script(RELEASE_LOCK_SCRIPT, keys=["lock:key"], args=["owner"]) == 1
+    assert await cache.get("lock:key") is None
+
+
+async def test_generation_bump_starts_from_clock_then_increments(redis_backend):
+    keys = [get_generation_key("tag:a"), get_generation_key("tag:b")]
+    await cache.set(keys[1], "41")
+
+    assert await invalidate_tags(["tag:a", "tag:b"])
+    first, second = await cache.get_many(keys)
+    # geração inicial: relógio do Redis em ms
+    assert len(first) == 13 and first.isdigit()
+    assert second == "42"
+
+    assert await invalidate_tags(["tag:a"])
+    assert await cache.get(keys[0]) == str(int(first) + 1)
+    for key in keys:
+        assert 0 < await cache.ttl(key) <= settings.cache_generation_ttl_seconds
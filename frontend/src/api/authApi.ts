@@ -9,7 +9,8 @@ import type {
 } from '../types/auth.types';
 
 const storeTokens = (
-  tokens: Pick<TokenResponse, 'access_token' | 'refresh_token'>
+  tokens: Pick<TokenResponse, 'access_token'> &
+    Partial<Pick<TokenResponse, 'refresh_token'>>
 ) => {
   localStorage.setItem('accessToken', tokens.access_token);
   if (authWithCredentials) {
@@ -46,7 +47,7 @@ export const refreshToken = async (refresh_token?: string) => {
     '/api/v1/auth/refresh',
     payload
   );
-  localStorage.setItem('accessToken', response.data.access_token);
+  storeTokens(response.data);
   return response;
 };
 
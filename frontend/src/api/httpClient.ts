@@ -26,6 +26,36 @@ httpClient.interceptors.request.use(
   error => Promise.reject(error)
 );
 
+// Refresh em andamento: 401s simultâneos reutilizam a mesma chamada, já que
+// cada refresh rotaciona o refresh token
+let pendingRefresh: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!pendingRefresh) {
+    const refreshToken = authWithCredentials
+      ? null
+      : localStorage.getItem('refreshToken');
+
+    pendingRefresh = httpClient
+      .post(
+        '/api/v1/auth/refresh',
+        refreshToken ? { refresh_token: refreshToken } : {}
+      )
+      .then(res => {
+        const { access_token, refresh_token } = res.data;
+        localStorage.setItem('accessToken', access_token);
+        if (refresh_token && !authWithCredentials) {
+          localStorage.setItem('refreshToken', refresh_token);
+        }
+        return access_token as string;
+      })
+      .finally(() => {
+        pendingRefresh = null;
+      });
+  }
+  return pendingRefresh;
+};
+
 // Interceptor de resposta para lidar com refresh automático do token
 httpClient.interceptors.response.use(
   response => response,
@@ -43,17 +73,7 @@ httpClient.interceptors.response.use(
     ) {
       originalRequest._retry = true;
       try {
-        const refreshToken = authWithCredentials
-          ? null
-          : localStorage.getItem('refreshToken');
-
-        const res = await httpClient.post(
-          '/api/v1/auth/refresh',
-          refreshToken ? { refresh_token: refreshToken } : {}
-        );
-
-        const { access_token } = res.data;
-        localStorage.setItem('accessToken', access_token);
+        const access_token = await refreshAccessToken();
 
         originalRequest.headers = originalRequest.headers || {};
         originalRequest.headers['Authorization'] = `Bearer ${access_token}`;
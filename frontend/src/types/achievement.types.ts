@@ -24,6 +24,11 @@ export interface Achievement {
   updated_at: string;
 }
 
+export interface AchievementCatalogItem extends Achievement {
+  holders_count: number;
+  holders_percentage: number;
+}
+
 export interface AchievementProgress {
   current: number;
   target: number;
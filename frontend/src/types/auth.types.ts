@@ -19,6 +19,7 @@ export interface TokenResponse {
 
 export interface AccessTokenResponse {
   access_token: string;
+  refresh_token?: string | null;
   token_type: string;
   expires_in: number;
 }